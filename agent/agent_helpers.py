@@ -7,6 +7,7 @@ scheduled tasks) behaves identically.
 """
 
 import asyncio
+import re
 from datetime import datetime, timezone, timedelta
 from langchain_core.messages import HumanMessage
 from config import get_logger, settings
@@ -14,8 +15,56 @@ from .memory_pruner import prune_messages
 
 logger = get_logger(__name__)
 
-# Maximum Telegram message length (Telegram supports 4096, leave margin)
-MAX_RESPONSE_LENGTH = 4000
+# Telegram's hard cap on a message. Telegram counts UTF-16 code units,
+# not Python characters.
+TELEGRAM_MESSAGE_LIMIT = 4096
+TRUNCATION_SUFFIX = "... (message truncated)"
+
+# Backtick-quoted runs inside an output-parser error message
+_PARSE_ERROR_RE = re.compile(r"`([^`]+)`", re.DOTALL)
+
+
+def utf16_len(text: str) -> int:
+    """Length of text in UTF-16 code units, as Telegram measures it."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def truncate_for_telegram(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> str:
+    """
+    Truncate plain text so that it fits in ``limit`` UTF-16 code units.
+
+    Emoji and other astral characters take two code units each, so a plain
+    ``len()`` check can let an over-long message through to Telegram.
+    Replies are cut only when sent: plain text here, MarkdownV2 by
+    ``to_markdown_v2`` after escaping.
+    """
+    # Every character is at most two code units, so short texts always fit
+    if len(text) * 2 <= limit or utf16_len(text) <= limit:
+        return text
+
+    # Binary-search the longest prefix that still leaves room for the suffix
+    budget = limit - utf16_len(TRUNCATION_SUFFIX)
+    lo, hi = 0, min(len(text), budget)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if utf16_len(text[:mid]) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + TRUNCATION_SUFFIX
+
+
+def extract_from_parse_error(exc: BaseException) -> str | None:
+    """
+    Recover the model's answer from a "Could not parse LLM output" error.
+
+    The parser quotes the raw output in backticks; the longest quoted run is
+    returned, or ``None`` if ``exc`` is not a parsing error.
+    """
+    error_text = str(exc)
+    if "Could not parse LLM output" not in error_text:
+        return None
+    return max(_PARSE_ERROR_RE.findall(error_text), key=len, default=None)
 
 
 def invoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
@@ -31,7 +80,8 @@ def invoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
                  (e.g. task scheduler) know where to reply.
 
     Returns:
-        The agent's final text response, truncated to ``MAX_RESPONSE_LENGTH``.
+        The agent's final text response, untruncated; it is cut to
+        Telegram's limit when sent.
 
     Raises:
         Re-raises any exception that is *not* a known LLM-parsing error.
@@ -93,11 +143,6 @@ def invoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
         else:
             response_text = "I'm having trouble processing that request."
 
-        # 6. Truncate
-        if len(response_text) > MAX_RESPONSE_LENGTH:
-            response_text = response_text[:MAX_RESPONSE_LENGTH] + "... (message truncated)"
-            logger.warning(f"Response truncated for user {user_id}")
-
         logger.info(f"Message processing completed for user {user_id}")
         return response_text
 
@@ -105,23 +150,57 @@ def invoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
         logger.error(f"Error processing message for user {user_id}: {e}", exc_info=True)
 
         # Handle known LLM-parsing errors gracefully
-        if "Could not parse LLM output" in str(e):
-            logger.warning("Attempting to extract response from parsing error")
-            error_text = str(e)
-            if "`" in error_text:
-                start_idx = error_text.find("`") + 1
-                end_idx = error_text.rfind("`")
-                if start_idx > 0 and end_idx > start_idx:
-                    extracted = error_text[start_idx:end_idx]
-                    logger.info(f"Extracted response from parsing error for user {user_id}")
-                    return extracted
+        extracted = extract_from_parse_error(e)
+        if extracted is not None:
+            logger.info(f"Extracted response from parsing error for user {user_id}")
+            return extracted
 
         raise
 
 
+def _build_prompt(message: str, chat_id: int) -> str:
+    """Prefix the user message with the current time and originating chat."""
+    utc_plus_1 = timezone(timedelta(hours=1))
+    current_time = datetime.now(utc_plus_1)
+    return (
+        f"Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S')} "
+        f"UTC+1 (Central European Time). "
+        f"From chat_id: {chat_id}, the user asked: {message}"
+    )
+
+
+def _thread_config(user_id: int) -> dict:
+    """LangGraph config selecting the user's conversation thread."""
+    return {"configurable": {"thread_id": str(user_id)}}
+
+
+async def _aprune_history(agent, config: dict, user_id: int) -> None:
+    """Summarise the thread's history if it exceeds the prune threshold."""
+    state = await agent.aget_state(config)
+
+    if state and state.values and "messages" in state.values:
+        history = state.values["messages"]
+        if len(history) > settings.MEMORY_PRUNE_THRESHOLD:
+            from .main import get_llm
+            llm = get_llm()
+            # prune_messages uses llm.invoke (sync), let's use async if possible
+            # for now keep it simple and just call it
+            pruned = await asyncio.to_thread(prune_messages, history, llm, settings.MEMORY_PRUNE_THRESHOLD)
+            if len(pruned) < len(history):
+                await agent.aupdate_state(config, {"messages": pruned})
+                logger.info(f"Updated agent state (async) with pruned history for user {user_id}")
+
+
+def _extract_response(agent_response) -> str:
+    """Pull the final message text out of an agent result."""
+    if agent_response and "messages" in agent_response:
+        return agent_response["messages"][-1].content
+    return "I'm having trouble processing that request."
+
+
 async def ainvoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
     """Async version of invoke_agent."""
-    from agent.rate_limiter import wait_for_rate_limit, get_rate_limiter
+    from agent.rate_limiter import wait_for_rate_limit
 
     logger.info(f"Processing message (async) for user {user_id}: '{message[:100]}...'")
 
@@ -133,47 +212,155 @@ async def ainvoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
         await asyncio.to_thread(wait_for_rate_limit)
 
         # 2. Enrich prompt
-        utc_plus_1 = timezone(timedelta(hours=1))
-        current_time = datetime.now(utc_plus_1)
-        prompt = (
-            f"Current time: {current_time.strftime('%Y-%m-%d %H:%M:%S')} "
-            f"UTC+1 (Central European Time). "
-            f"From chat_id: {chat_id}, the user asked: {message}"
-        )
+        prompt = _build_prompt(message, chat_id)
 
         # 3. Pruning
-        config = {"configurable": {"thread_id": str(user_id)}}
-        state = await agent.aget_state(config)
-        
-        if state and state.values and "messages" in state.values:
-            history = state.values["messages"]
-            if len(history) > settings.MEMORY_PRUNE_THRESHOLD:
-                from .main import get_llm
-                llm = get_llm()
-                # prune_messages uses llm.invoke (sync), let's use async if possible
-                # for now keep it simple and just call it
-                pruned = await asyncio.to_thread(prune_messages, history, llm, settings.MEMORY_PRUNE_THRESHOLD)
-                if len(pruned) < len(history):
-                    await agent.aupdate_state(config, {"messages": pruned})
-                    logger.info(f"Updated agent state (async) with pruned history for user {user_id}")
+        config = _thread_config(user_id)
+        await _aprune_history(agent, config, user_id)
 
         # 4. Invoke
         messages = [HumanMessage(content=prompt)]
         agent_response = await agent.ainvoke({"messages": messages}, config=config)
 
         # 5. Extract & Truncate
-        if agent_response and "messages" in agent_response:
-            response_text = agent_response["messages"][-1].content
-        else:
-            response_text = "I'm having trouble processing that request."
-
-        if len(response_text) > MAX_RESPONSE_LENGTH:
-            response_text = response_text[:MAX_RESPONSE_LENGTH] + "... (message truncated)"
-            logger.warning(f"Response truncated for user {user_id}")
-
-        return response_text
+        return _extract_response(agent_response)
 
     except Exception as e:
         logger.error(f"Error in ainvoke_agent for user {user_id}: {e}", exc_info=True)
-        # Mirror the extract-from-error logic if needed, but ainvoke is cleaner
+
+        extracted = extract_from_parse_error(e)
+        if extracted is not None:
+            logger.info(f"Extracted response from parsing error for user {user_id}")
+            return extracted
+
         raise
+
+
+class BatchingAgentQueue:
+    """
+    Collects agent requests that arrive close together and runs them through
+    a single ``agent.abatch`` call.
+
+    A batch is flushed once ``max_batch_size`` requests are waiting or
+    ``max_wait`` seconds have passed since the first one arrived. Two requests
+    for the same conversation thread are never placed in the same batch, since
+    they would race on the checkpointer; the later one is held back for the
+    next batch so each user's messages are still processed in order.
+    """
+
+    def __init__(self, agent, max_batch_size: int = 8, max_wait: float = 0.05):
+        self.agent = agent
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._deferred: list = []
+        self._worker: asyncio.Task | None = None
+
+    async def submit(self, message: str, user_id: int, chat_id: int) -> str:
+        """Queue a request and wait for the agent's (truncated) response."""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((message, user_id, chat_id, future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """Gather up to ``max_batch_size`` requests with distinct thread IDs."""
+        pending = self._deferred
+        self._deferred = []
+        if not pending:
+            pending.append(await self._queue.get())
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        batch, seen = [], set()
+        for item in pending:
+            user_id = item[1]
+            if user_id in seen or len(batch) >= self.max_batch_size:
+                self._deferred.append(item)
+            else:
+                seen.add(user_id)
+                batch.append(item)
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._process_batch(batch)
+            except Exception as e:
+                logger.error(f"Agent batch failed: {e}", exc_info=True)
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def _process_batch(self, batch: list) -> None:
+        from agent.rate_limiter import wait_for_rate_limit
+
+        logger.info(f"Processing agent batch of {len(batch)} request(s)")
+
+        # The batch goes out together, so it takes one rate-limit slot
+        # (counting every request toward the per-minute cap) instead of
+        # waiting out the minimum delay once per request
+        await asyncio.to_thread(wait_for_rate_limit, len(batch))
+
+        # A failed prune only fails that user's request, not the whole batch
+        ready, inputs, configs = [], [], []
+        for item in batch:
+            message, user_id, chat_id, future = item
+            config = _thread_config(user_id)
+            try:
+                await _aprune_history(self.agent, config, user_id)
+            except Exception as e:
+                logger.error(f"Error pruning history for user {user_id}: {e}", exc_info=True)
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            ready.append(item)
+            inputs.append({"messages": [HumanMessage(content=_build_prompt(message, chat_id))]})
+            # abatch reads the concurrency cap from the config, not from a kwarg
+            configs.append({**config, "max_concurrency": self.max_batch_size})
+        if not ready:
+            return
+
+        results = await self.agent.abatch(inputs, config=configs, return_exceptions=True)
+
+        for (_, user_id, _, future), result in zip(ready, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                logger.error(f"Error in batched agent call for user {user_id}: {result}")
+                extracted = extract_from_parse_error(result)
+                if extracted is not None:
+                    future.set_result(extracted)
+                else:
+                    future.set_exception(result)
+            else:
+                future.set_result(_extract_response(result))
+
+
+# Global batching queue instance
+_agent_queue: BatchingAgentQueue | None = None
+
+
+def get_agent_queue(agent) -> BatchingAgentQueue:
+    """Get the global batching queue, creating it for ``agent`` on first use."""
+    global _agent_queue
+    if _agent_queue is None or _agent_queue.agent is not agent:
+        _agent_queue = BatchingAgentQueue(agent, max_batch_size=settings.AGENT_MAX_CONCURRENCY)
+    return _agent_queue
+
+
+async def abatch_invoke_agent(agent, message: str, user_id: int, chat_id: int) -> str:
+    """Route a request through the global batching queue for ``agent``."""
+    return await get_agent_queue(agent).submit(message, user_id, chat_id)
@@ -4,6 +4,7 @@ from langgraph.checkpoint.sqlite import SqliteSaver
 from langchain_core.messages import HumanMessage, AIMessage
 import dotenv
 import os
+import sqlite3
 from pathlib import Path
 
 from .tools.tool_registry import register_tools
@@ -47,12 +48,22 @@ Available tool tips:
 # ---------------------------------------------------------------------------
 _agent = None
 _main_llm = None
+_memory_conn = None
 _agent_initialized = False
 
 
+def build_agent(llm, tools, checkpointer):
+    """Create the ReAct agent graph from an LLM, its tools and a checkpointer."""
+    return create_react_agent(
+        model=llm,
+        tools=tools,
+        checkpointer=checkpointer,
+    )
+
+
 def _initialize_agent():
     """Create the LLM, register tools, open memory, and build the agent."""
-    global _agent, _agent_initialized
+    global _agent, _agent_initialized, _memory_conn
 
     if _agent_initialized:
         return
@@ -89,18 +100,14 @@ def _initialize_agent():
     tools = register_tools(shared_llm=agents_llm)
     logger.info(f"Registered {len(tools)} tools for the agent with distributed API keys")
 
-    # Create persistent SQLite-based memory for conversation history
-    checkpoint_db_path = "agent_memory.db"
-    memory_conn = SqliteSaver.from_conn_string(checkpoint_db_path)
-    memory = memory_conn.__enter__()
-    logger.info(f"Initialized persistent SQLite memory at {checkpoint_db_path}")
+    # Create persistent SQLite-based memory for conversation history. The
+    # module owns the connection so it lives as long as the agent does
+    _memory_conn = sqlite3.connect(settings.AGENT_MEMORY_DB, check_same_thread=False)
+    memory = SqliteSaver(_memory_conn)
+    logger.info(f"Initialized persistent SQLite memory at {settings.AGENT_MEMORY_DB}")
 
     # Create the modern LangGraph agent with memory using main LLM
-    _agent = create_react_agent(
-        model=main_llm,
-        tools=tools,
-        checkpointer=memory,
-    )
+    _agent = build_agent(main_llm, tools, memory)
     _agent_initialized = True
     logger.info("Created LangGraph ReAct agent with persistent memory")
 
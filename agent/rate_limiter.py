@@ -31,21 +31,28 @@ class RateLimiter:
         
         logger.info(f"Rate limiter initialized: {min_delay_seconds}s delay, max {max_requests_per_minute} requests/min")
     
-    def wait_if_needed(self):
+    def wait_if_needed(self, count: int = 1):
         """
         Wait if necessary to respect rate limits.
         Call this before making an API request.
+        
+        Args:
+            count: Requests about to be sent together (e.g. one agent batch).
+                They share a single min-delay slot but all count toward the
+                per-minute limit.
         """
+        count = max(1, min(count, self.max_requests_per_minute))
         current_time = time.time()
         
         # Clean up old timestamps (older than 1 minute)
         one_minute_ago = current_time - 60
         self.request_timestamps = [ts for ts in self.request_timestamps if ts > one_minute_ago]
         
-        # Check if we're at the per-minute limit
-        if len(self.request_timestamps) >= self.max_requests_per_minute:
-            # Calculate how long to wait until oldest request is > 1 minute old
-            oldest_timestamp = self.request_timestamps[0]
+        # Check if the batch would go over the per-minute limit
+        overflow = len(self.request_timestamps) + count - self.max_requests_per_minute
+        if overflow > 0:
+            # Wait until enough of the oldest requests are > 1 minute old
+            oldest_timestamp = self.request_timestamps[overflow - 1]
             wait_time = 60 - (current_time - oldest_timestamp) + 0.1  # Add 0.1s buffer
             
             if wait_time > 0:
@@ -63,9 +70,9 @@ class RateLimiter:
                 time.sleep(wait_time)
                 current_time = time.time()
         
-        # Record this request
+        # Record these requests
         self.last_request_time = current_time
-        self.request_timestamps.append(current_time)
+        self.request_timestamps.extend([current_time] * count)
         
         # Log rate limit status
         requests_in_last_minute = len(self.request_timestamps)
@@ -95,12 +102,12 @@ _global_rate_limiter = RateLimiter(
 )
 
 
-def wait_for_rate_limit():
+def wait_for_rate_limit(count: int = 1):
     """
     Global function to enforce rate limiting before API calls.
-    Use this before any Gemini API request.
+    Use this before any Gemini API request, passing ``count`` for a batch.
     """
-    _global_rate_limiter.wait_if_needed()
+    _global_rate_limiter.wait_if_needed(count)
 
 
 def get_rate_limiter() -> RateLimiter:
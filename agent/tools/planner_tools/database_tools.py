@@ -3,6 +3,7 @@ Database tools for the personal assistant agent.
 Provides agent-friendly tools for managing single-user productivity data.
 """
 
+from functools import lru_cache
 from langchain_core.tools import tool
 from sqlalchemy.orm import Session
 from datetime import datetime, date, time
@@ -10,6 +11,11 @@ from typing import List, Optional, Dict, Any
 import json
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import the refactored models
 from database.models import (
     Base, create_database_engine, create_tables, get_session_factory, get_session,
@@ -21,6 +27,18 @@ from config import get_logger
 
 logger = get_logger(__name__)
 
+def _to_json(data) -> str:
+    """
+    Serialise tool output as compact JSON, using orjson when installed.
+    
+    The output only ever goes to the LLM, so indentation is dropped: it adds
+    bytes and tokens without helping the model read the structure.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(",", ":"))
+
+
 # Database session management
 _engine = None
 _SessionFactory = None
@@ -132,7 +150,7 @@ def get_habits_tool(active_only: bool = True) -> str:
             habits = query.all()
             habits_data = [habit_to_dict(habit) for habit in habits]
             
-            return json.dumps(habits_data, indent=2)
+            return _to_json(habits_data)
             
         finally:
             session.close()
@@ -250,7 +268,7 @@ def get_tasks_tool(status: Optional[str] = None, include_completed: bool = False
             tasks = query.order_by(Task.due_date.asc(), Task.priority_level.desc()).all()
             tasks_data = [task_to_dict(task) for task in tasks]
             
-            return json.dumps(tasks_data, indent=2)
+            return _to_json(tasks_data)
             
         finally:
             session.close()
@@ -404,7 +422,7 @@ def get_daily_schedule_tool(schedule_date: str) -> str:
                 "generated_at": schedule.generated_at.isoformat() if schedule.generated_at else None
             }
             
-            return json.dumps(schedule_data, indent=2)
+            return _to_json(schedule_data)
             
         finally:
             session.close()
@@ -610,7 +628,7 @@ def get_productivity_insights_tool(days: int = 7) -> str:
                 "average_completions_per_day": round((habit_completions + completed_tasks) / days, 1)
             }
             
-            return json.dumps(insights, indent=2)
+            return _to_json(insights)
             
         finally:
             session.close()
@@ -649,7 +667,7 @@ def search_items_tool(query: str, item_type: str = "both") -> str:
                 ).all()
                 results["tasks"] = [task_to_dict(task) for task in tasks]
             
-            return json.dumps(results, indent=2)
+            return _to_json(results)
             
         finally:
             session.close()
@@ -658,9 +676,10 @@ def search_items_tool(query: str, item_type: str = "both") -> str:
         return f"Error searching items: {str(e)}"
 
 
-def get_database_tools():
-    """Get all database tools for the agent."""
-    return [
+@lru_cache(maxsize=1)
+def _database_tools() -> tuple:
+    """Build the database tool set once; a tuple so the cached copy can't change."""
+    return (
         # Habit management
         create_habit_tool,
         get_habits_tool,
@@ -683,4 +702,8 @@ def get_database_tools():
         # Analytics
         get_productivity_insights_tool,
         search_items_tool
-    ]
+    )
+
+def get_database_tools():
+    """Get all database tools for the agent as a fresh list the caller may modify."""
+    return list(_database_tools())
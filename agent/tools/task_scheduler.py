@@ -119,7 +119,7 @@ async def run_scheduled_task(prompt: str, chat_id: str, task_id: str = None) ->
         
         # Avoid circular import by importing here
         from agent.main import agent_executor
-        from agent.agent_helpers import invoke_agent
+        from agent.agent_helpers import invoke_agent, truncate_for_telegram
         
         # Build a descriptive message for the agent
         enriched_prompt = (
@@ -139,7 +139,7 @@ async def run_scheduled_task(prompt: str, chat_id: str, task_id: str = None) ->
         )
         
         bot = Bot(token=os.getenv('TELEGRAM_BOT_TOKEN'))
-        await bot.send_message(chat_id=chat_id, text=output)
+        await bot.send_message(chat_id=chat_id, text=truncate_for_telegram(output))
         logger.info(f"Scheduled task completed successfully{f' ({task_id})' if task_id else ''}")
         logger.debug(f"Task output: {output[:200]}...")
         
@@ -1,4 +1,5 @@
-from typing import List, Callable, Dict, Union
+import weakref
+from typing import List, Callable, Dict, FrozenSet, Set, Tuple, Union
 from config import get_logger
 
 logger = get_logger(__name__)
@@ -7,6 +8,15 @@ logger = get_logger(__name__)
 # Format: {category: [tool_function_or_instance, ...]}
 _TOOL_REGISTRY: Dict[str, List[Union[Callable, object]]] = {}
 
+# Materialised tool lists keyed by (category, id(shared_llm)), each stored
+# with a reference to its LLM so a recycled id is never mistaken for a hit,
+# and the categories each tool name has been returned under
+_TOOLS_CACHE: Dict[tuple, Tuple[Callable, list]] = {}
+_TOOL_CATEGORIES: Dict[str, Set[str]] = {}
+
+# Groups that make up the 'all' category, in order
+_ALL_GROUPS = ("telegram", "scheduler", "search", "agents", "database")
+
 def register_tool(category: str):
     """
     Decorator to register a tool into a specific category.
@@ -18,6 +28,8 @@ def register_tool(category: str):
         if category not in _TOOL_REGISTRY:
             _TOOL_REGISTRY[category] = []
         _TOOL_REGISTRY[category].append(tool)
+        _TOOLS_CACHE.clear()
+        _TOOL_CATEGORIES.clear()
         return tool
     return decorator
 
@@ -25,6 +37,36 @@ def get_registered_tools(category: str) -> List:
     """Return all tools registered in a category."""
     return _TOOL_REGISTRY.get(category, [])
 
+def _tool_name(tool) -> str:
+    return getattr(tool, "name", None) or tool.__name__
+
+def tool_categories(tool) -> FrozenSet[str]:
+    """
+    Return the categories a tool from register_tools has been listed under.
+    
+    Only categories built since the registry last changed are known; build
+    'all' first to partition by its groups.
+    """
+    return frozenset(_TOOL_CATEGORIES.get(_tool_name(tool), ()))
+
+def _llm_ref(llm, key: tuple) -> Callable:
+    """
+    Reference to llm that doesn't keep it alive where weakrefs are supported.
+    
+    Once llm is collected its entry under key is dropped from _TOOLS_CACHE,
+    unless a newer entry has taken the key over.
+    """
+    def evict(ref):
+        entry = _TOOLS_CACHE.get(key)
+        if entry is not None and entry[0] is ref:
+            del _TOOLS_CACHE[key]
+    
+    try:
+        return weakref.ref(llm, evict)
+    except TypeError:
+        # None and other non-weakrefable values are simply held
+        return lambda: llm
+
 # ── Dynamic Tool Loading ────────────────────────────────────────
 
 # For tools that require LLM or dynamic creation, we keep the lambdas
@@ -70,21 +112,33 @@ def register_tools(category: str = "all", shared_llm=None) -> list:
     """
     Return a list of LangChain tools for the given category.
     Categories: all, telegram, scheduler, database, todoist, news, agents, planning.
+    
+    Each category is built once per shared_llm and cached; use
+    tool_categories() to partition the 'all' list instead of asking for
+    each category separately.
     """
     # Trigger imports of tools so they register themselves
     from . import telegram_scraper, task_scheduler, extra_tools
     
-    if category in _CATEGORIES:
-        return _CATEGORIES[category](shared_llm)
-
-    # 'all' (default) — every tool group combined
-    all_tools = []
-    # Add registered tools from known categories
-    for cat in ["telegram", "scheduler", "search"]:
-        all_tools.extend(get_registered_tools(cat))
-    
-    # Add dynamic tools
-    all_tools.extend(get_agent_tools(shared_llm))
-    all_tools.extend(get_database_tools_wrapper())
-    
-    return all_tools
\ No newline at end of file
+    if category not in _CATEGORIES:
+        category = "all"
+    # LLMs are unhashable pydantic models, so the key uses id() and the
+    # entry's reference confirms it still belongs to this very object
+    key = (category, id(shared_llm))
+    entry = _TOOLS_CACHE.get(key)
+    if entry is not None and entry[0]() is not shared_llm:
+        # Left behind by a collected LLM whose id shared_llm now has
+        del _TOOLS_CACHE[key]
+        entry = None
+    if entry is None:
+        if category == "all":
+            # 'all' (default) — every tool group combined
+            tools = []
+            for group in _ALL_GROUPS:
+                tools.extend(register_tools(group, shared_llm))
+        else:
+            tools = _CATEGORIES[category](shared_llm)
+            for tool in tools:
+                _TOOL_CATEGORIES.setdefault(_tool_name(tool), set()).add(category)
+        entry = _TOOLS_CACHE[key] = (_llm_ref(shared_llm, key), tools)
+    return list(entry[1])
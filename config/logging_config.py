@@ -1,7 +1,10 @@
 """
 Centralized logging configuration with colored output.
 """
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from typing import Dict, Any
 
@@ -60,16 +63,39 @@ class ColoredFormatter(logging.Formatter):
         return formatted_message
 
 
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that hands the record over untouched.
+
+    The stock ``prepare`` formats the message and traceback in the calling
+    thread; skipping it leaves all formatting to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 import threading
 
 # Global lock for thread-safe logging setup
 _logging_setup_lock = threading.Lock()
 _logging_is_configured = False
+_queue_listener = None
+
+def _stop_queue_listener():
+    """Flush and stop the background log listener, if one is running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
 
 def reset_logging_config():
     """Reset the logging configuration flag to allow reconfiguration."""
     global _logging_is_configured
     with _logging_setup_lock:
+        _stop_queue_listener()
         _logging_is_configured = False
 
 def setup_logging(
@@ -78,7 +104,8 @@ def setup_logging(
     log_file_path: str = "app.log",
     use_colors: bool = True,
     format_string: str = None,
-    third_party_level: str = "WARNING"
+    third_party_level: str = "WARNING",
+    use_queue: bool = False
 ) -> None:
     """
     Set up centralized logging configuration with colors.
@@ -90,6 +117,8 @@ def setup_logging(
         use_colors: Whether to use colored output for console
         format_string: Custom format string
         third_party_level: Logging level for third-party libraries
+        use_queue: Route records through a queue so formatting and I/O happen
+                   on a background thread instead of the caller's (event loop)
     """
     global _logging_is_configured
     with _logging_setup_lock:
@@ -117,8 +146,7 @@ def setup_logging(
         console_formatter = ColoredFormatter(format_string, use_colors=use_colors)
         console_handler.setFormatter(console_formatter)
         
-        # Add console handler
-        root_logger.addHandler(console_handler)
+        handlers = [console_handler]
         
         # File handler (without colors)
         if log_to_file:
@@ -129,7 +157,20 @@ def setup_logging(
             file_formatter = ColoredFormatter(format_string, use_colors=False)
             file_handler.setFormatter(file_formatter)
             
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        if use_queue:
+            global _queue_listener
+            _stop_queue_listener()
+            log_queue = queue.SimpleQueue()
+            _queue_listener = logging.handlers.QueueListener(
+                log_queue, *handlers, respect_handler_level=True
+            )
+            _queue_listener.start()
+            root_logger.addHandler(_DeferredQueueHandler(log_queue))
+        else:
+            for handler in handlers:
+                root_logger.addHandler(handler)
         
         # Set root logger level
         root_logger.setLevel(log_level)
@@ -185,7 +226,8 @@ def setup_bot_logging():
         log_to_file=True,
         log_file_path="development.log",
         use_colors=True,
-        third_party_level="ERROR"  # Even less noise for bot usage
+        third_party_level="ERROR",  # Even less noise for bot usage
+        use_queue=True  # Keep log I/O off the asyncio event loop
     )
 
 
@@ -29,6 +29,9 @@ _OPTIONAL_VARS = {
     "TELEGRAM_API_HASH": "Telegram API hash for Telethon scraper",
     "LLM_MODEL": "LLM model to use (default: gemini-2.5-flash)",
     "MEMORY_PRUNE_THRESHOLD": "Number of messages before pruning history (default: 20)",
+    "AGENT_MAX_CONCURRENCY": "Maximum concurrent agent invocations from the bot (default: 8)",
+    "LLM_CACHE_DB": "SQLite file for the persistent LLM response cache (default: .langchain_cache.db)",
+    "AGENT_MEMORY_DB": "SQLite file for the agent's conversation memory (default: agent_memory.db)",
 }
 
 
@@ -111,3 +114,6 @@ RATE_LIMIT_DELAY: float = float(os.getenv("RATE_LIMIT_DELAY", "4.0"))
 RATE_LIMIT_MAX_RPM: int = int(os.getenv("RATE_LIMIT_MAX_RPM", "15"))
 LLM_MODEL: str = os.getenv("LLM_MODEL", "gemini-2.5-flash")
 MEMORY_PRUNE_THRESHOLD: int = int(os.getenv("MEMORY_PRUNE_THRESHOLD", "20"))
+AGENT_MAX_CONCURRENCY: int = int(os.getenv("AGENT_MAX_CONCURRENCY", "8"))
+LLM_CACHE_DB: str = os.getenv("LLM_CACHE_DB", ".langchain_cache.db")
+AGENT_MEMORY_DB: str = os.getenv("AGENT_MEMORY_DB", "agent_memory.db")
@@ -16,6 +16,8 @@ from sqlalchemy import (
 )
 from sqlalchemy.orm import relationship, sessionmaker, Session, validates, declarative_base
 from sqlalchemy.sql import func
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
 import os
 
 Base = declarative_base()
@@ -370,11 +372,35 @@ class Reminder(Base):
 
 
 # Database utility functions
-def create_database_engine(database_url: str = None):
-    """Create and return a SQLAlchemy engine."""
+def create_database_engine(database_url: str = None, **engine_kwargs):
+    """
+    Create and return a SQLAlchemy engine.
+    
+    In-memory SQLite uses a StaticPool so every session shares the one
+    connection (and therefore the one database); other databases get a
+    pre-pinged, recycled connection pool. ``engine_kwargs`` override these.
+    """
     if database_url is None:
         database_url = os.getenv('DATABASE_URL', 'sqlite:///personal_assistant.db')
-    return create_engine(database_url, echo=False)
+    
+    url = make_url(database_url)
+    is_sqlite_memory = url.get_backend_name() == 'sqlite' and (
+        url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+    )
+    if is_sqlite_memory:
+        pool_kwargs = {
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False},
+        }
+    else:
+        pool_kwargs = {
+            'pool_size': 10,
+            'max_overflow': 20,
+            'pool_pre_ping': True,
+            'pool_recycle': 3600,
+        }
+    pool_kwargs.update(engine_kwargs)
+    return create_engine(database_url, echo=False, **pool_kwargs)
 
 
 def create_tables(engine):
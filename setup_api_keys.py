@@ -13,14 +13,13 @@ def setup_multi_api_keys():
     
     env_file = Path(".env")
     
-    # Read existing .env if it exists
+    # Read existing .env once; the lines are reused when writing it back
+    env_lines = env_file.read_text().splitlines() if env_file.exists() else []
     existing_env = {}
-    if env_file.exists():
-        with open(env_file, "r") as f:
-            for line in f:
-                if "=" in line and not line.startswith("#"):
-                    key, value = line.strip().split("=", 1)
-                    existing_env[key] = value
+    for line in env_lines:
+        if "=" in line and not line.startswith("#"):
+            key, value = line.strip().split("=", 1)
+            existing_env[key] = value
     
     # Check current API key status
     primary_key = existing_env.get("GOOGLE_API_KEY", "")
@@ -73,11 +72,9 @@ def setup_multi_api_keys():
     env_content = []
     
     # Preserve non-API key entries
-    if env_file.exists():
-        with open(env_file, "r") as f:
-            for line in f:
-                if not line.startswith("GOOGLE_API_KEY"):
-                    env_content.append(line.rstrip())
+    for line in env_lines:
+        if not line.startswith("GOOGLE_API_KEY"):
+            env_content.append(line.rstrip())
     
     # Add API keys
     env_content.append(f"GOOGLE_API_KEY={primary_key}")
@@ -0,0 +1,85 @@
+"""
+Helpers for rendering agent responses as Telegram MarkdownV2.
+
+Sanitising the text up front lets the handlers send with
+``parse_mode='MarkdownV2'`` on the first try instead of sending, failing on
+a stray ``_`` or backtick, and re-sending as plain text.
+"""
+
+import re
+from typing import Optional
+from telegram.helpers import escape_markdown
+from agent.agent_helpers import TELEGRAM_MESSAGE_LIMIT, TRUNCATION_SUFFIX, utf16_len
+
+# Fenced code blocks (a language tag only when a newline follows it), inline
+# code, **bold**, *italic* / _italic_ and [links](url) whose URL may hold one
+# level of balanced parentheses. Italics must hug their text and stand apart
+# from words, so list bullets, snake_case and 2*3*4 stay literal.
+# Everything outside these regions is escaped as literal text.
+_MARKUP_RE = re.compile(
+    r"```(?:([\w+-]*)\n)?(.*?)```"
+    r"|`([^`\n]+)`"
+    r"|\*\*(.+?)\*\*"
+    r"|(?<!\w)\*(?![\s*])([^*\n]+?)(?<!\s)\*(?!\w)"
+    r"|(?<!\w)_(?![\s_])([^_\n]+?)(?<!\s)_(?!\w)"
+    r"|\[([^\]\n]+)\]\(((?:[^()\s]|\([^()\s]*\))+)\)",
+    re.DOTALL,
+)
+
+
+def escape_markdown_v2(text: str) -> str:
+    """Escape every MarkdownV2 reserved character so text renders literally."""
+    return escape_markdown(text, version=2)
+
+
+def _convert(text: str) -> str:
+    """Escape text as MarkdownV2, keeping the markup _MARKUP_RE recognises."""
+    parts = []
+    pos = 0
+    for match in _MARKUP_RE.finditer(text):
+        parts.append(escape_markdown_v2(text[pos:match.start()]))
+        language, block, code, bold, star_italic, underscore_italic, label, url = match.groups()
+        if block is not None:
+            body = escape_markdown(block, version=2, entity_type="pre")
+            parts.append(f"```{language or ''}\n{body}```")
+        elif code is not None:
+            parts.append(f"`{escape_markdown(code, version=2, entity_type='code')}`")
+        elif bold is not None:
+            parts.append(f"*{escape_markdown_v2(bold)}*")
+        elif label is not None:
+            target = escape_markdown(url, version=2, entity_type="text_link")
+            parts.append(f"[{escape_markdown_v2(label)}]({target})")
+        else:
+            parts.append(f"_{escape_markdown_v2(star_italic or underscore_italic)}_")
+        pos = match.end()
+    parts.append(escape_markdown_v2(text[pos:]))
+    return "".join(parts)
+
+
+def to_markdown_v2(text: str, limit: Optional[int] = TELEGRAM_MESSAGE_LIMIT) -> str:
+    """
+    Convert the LLM's Markdown-ish output into valid Telegram MarkdownV2.
+
+    Code blocks, inline code, ``**bold**``, ``*italic*`` / ``_italic_`` and
+    ``[links](url)`` are kept as formatting; all other reserved characters
+    are escaped.
+
+    Escaping lengthens the text, so a response that fitted Telegram's limit
+    before conversion may not after it. When the result exceeds ``limit``
+    UTF-16 code units the source is cut short (before escaping, so no escape
+    or entity is split) and marked as truncated. Pass ``None`` to skip the
+    check.
+    """
+    converted = _convert(text)
+    if limit is None or utf16_len(converted) <= limit:
+        return converted
+
+    # Binary-search the longest source prefix whose conversion still fits
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if utf16_len(_convert(text[:mid] + TRUNCATION_SUFFIX)) <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    return _convert(text[:lo] + TRUNCATION_SUFFIX)
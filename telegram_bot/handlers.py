@@ -1,12 +1,15 @@
+import asyncio
 from telegram import Update
+from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 import logging
-# Set up colored logging
-from config import setup_development_logging, get_logger
+# Logging is configured by the entry point (telegram_bot.main), not on import
+from config import get_logger, settings
 from config.settings import is_user_allowed
 from .voice_processor import transcribe_voice_message, process_voice_message_with_agent
+from .formatting import escape_markdown_v2, to_markdown_v2, TELEGRAM_MESSAGE_LIMIT
+from agent.agent_helpers import truncate_for_telegram, utf16_len
 
-setup_development_logging()
 logger = get_logger(__name__)
 
 # Import agent with logging
@@ -19,13 +22,16 @@ except Exception as e:
     logger.error(f"Failed to import agent: {e}", exc_info=True)
     agent = None
 
+# Caps concurrent agent calls so a burst of updates can't blow past the LLM rate limits
+AGENT_SEM = asyncio.Semaphore(settings.AGENT_MAX_CONCURRENCY)
+
 
 async def process_text_message(user_message: str, user_id: int, chat_id: int, agent) -> str:
     """
     Process a text message through the agent and return the response.
     """
-    from agent.agent_helpers import ainvoke_agent
-    return await ainvoke_agent(agent, user_message, user_id, chat_id)
+    from agent.agent_helpers import abatch_invoke_agent
+    return await abatch_invoke_agent(agent, user_message, user_id, chat_id)
 
 
 async def echo_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -54,21 +60,26 @@ async def echo_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     try:
         # Send a "thinking" message to show the bot is processing
         thinking_message = await update.message.reply_text("🤔 Thinking...")
-        logger.debug(f"Sent thinking message to user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Sent thinking message to user {user_id}")
         
         # Process the text message through the agent
-        response_text = await process_text_message(user_message, user_id, chat_id, agent)
+        async with AGENT_SEM:
+            response_text = await process_text_message(user_message, user_id, chat_id, agent)
         
         # Send the response
-        logger.debug(f"Sending final response to user {user_id}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Sending final response to user {user_id}")
         try:
-            # Try to send with Markdown formatting first
-            await thinking_message.edit_text(response_text, parse_mode='Markdown')
+            # The response is escaped up front, so MarkdownV2 should parse first time
+            await thinking_message.edit_text(
+                to_markdown_v2(response_text), parse_mode='MarkdownV2'
+            )
             logger.info(f"Successfully sent formatted response to user {user_id}")
-        except Exception as format_error:
+        except BadRequest as format_error:
             logger.warning(f"Markdown formatting failed, sending as plain text: {format_error}")
             # Fallback to plain text if Markdown fails
-            await thinking_message.edit_text(response_text)
+            await thinking_message.edit_text(truncate_for_telegram(response_text))
             logger.info(f"Successfully sent plain text response to user {user_id}")
         
     except Exception as e:
@@ -111,12 +122,18 @@ async def voice_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
     voice_file_id = update.effective_message.voice.file_id
 
     try:
-        # Send a "transcribing" message
-        processing_message = await update.message.reply_text("🎙️ Transcribing voice message...")
-        logger.debug(f"Sent transcribing message to user {user_id}")
+        # Send a "transcribing" message without waiting on it: the download and
+        # transcription don't need the message object, so they start right away
+        processing_task = asyncio.create_task(
+            update.message.reply_text("🎙️ Transcribing voice message...")
+        )
 
         # Transcribe the voice message
         transcribed_text = await transcribe_voice_message(voice_file_id, context.bot)
+
+        processing_message = await processing_task
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Sent transcribing message to user {user_id}")
         
         if not transcribed_text:
             await processing_message.edit_text(
@@ -130,21 +147,24 @@ async def voice_message_handler(update: Update, context: ContextTypes.DEFAULT_TY
         await processing_message.edit_text("🤔 Processing your message...")
         
         # Process the transcribed text through the agent
-        response_text = await process_voice_message_with_agent(
-            transcribed_text, agent, user_id, chat_id
-        )
+        async with AGENT_SEM:
+            response_text = await process_voice_message_with_agent(
+                transcribed_text, agent, user_id, chat_id
+            )
         
         # Send the final response
         try:
+            # The transcription header shares the message limit with the reply
+            header = f"🎙️ *Voice Message:* {escape_markdown_v2(transcribed_text)}\n\n"
             await processing_message.edit_text(
-                f"🎙️ **Voice Message:** {transcribed_text}\n\n{response_text}",
-                parse_mode='Markdown'
+                header + to_markdown_v2(response_text, TELEGRAM_MESSAGE_LIMIT - utf16_len(header)),
+                parse_mode='MarkdownV2'
             )
             logger.info(f"Successfully sent voice response to user {user_id}")
-        except Exception as format_error:
+        except BadRequest as format_error:
             logger.warning(f"Markdown formatting failed, sending as plain text: {format_error}")
             await processing_message.edit_text(
-                f"🎙️ Voice Message: {transcribed_text}\n\n{response_text}"
+                truncate_for_telegram(f"🎙️ Voice Message: {transcribed_text}\n\n{response_text}")
             )
             logger.info(f"Successfully sent plain text voice response to user {user_id}")
         
@@ -3,19 +3,32 @@ import os
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 from dotenv import load_dotenv
+from langchain_core.globals import set_llm_cache
+from langchain_community.cache import SQLiteCache
 
-from .handlers import echo_message, error_handler, voice_message_handler
-from config import setup_bot_logging, get_logger
+from config import setup_bot_logging, get_logger, settings
 from config.settings import require_environment
+from .handlers import echo_message, error_handler, voice_message_handler
 
 # Load environment variables
 load_dotenv()
 
-# Set up bot-specific logging with minimal third-party noise
-setup_bot_logging()
 logger = get_logger(__name__)
 
 
+def setup_llm_cache() -> None:
+    """Persist LLM responses in SQLite so the cache survives bot restarts."""
+    cache = SQLiteCache(database_path=settings.LLM_CACHE_DB)
+
+    # WAL lets concurrent handlers read the cache while another writes.
+    # The journal mode is stored in the database file, so setting it once is enough.
+    with cache.engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+
+    set_llm_cache(cache)
+    logger.info(f"LLM response cache enabled at {settings.LLM_CACHE_DB}")
+
+
 def create_application() -> Application:
     """Create and configure the Telegram bot application."""
     # Fail fast if required env vars are missing
@@ -23,8 +36,17 @@ def create_application() -> Application:
 
     bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
 
-    # Create the Application
-    application = Application.builder().token(bot_token).build()
+    # Create the Application with a connection pool large enough for
+    # concurrent get_file / edit_text / download calls (PTB default is 1)
+    application = (
+        Application.builder()
+        .token(bot_token)
+        .connection_pool_size(32)
+        .pool_timeout(10)
+        .read_timeout(30)
+        .write_timeout(30)
+        .build()
+    )
 
     # Register message handler for non-command messages
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, echo_message))
@@ -36,6 +58,10 @@ def create_application() -> Application:
 
 def main() -> None:
     """Start the bot."""
+    # Set up bot-specific logging with minimal third-party noise. Importing
+    # this module never configures logging; only running the bot does.
+    setup_bot_logging()
+    setup_llm_cache()
     application = create_application()
 
     logger.info("Bot is starting...")
@@ -3,27 +3,72 @@ Voice message processing module for Telegram bot.
 Handles speech-to-text conversion using faster-whisper.
 """
 
-from faster_whisper import WhisperModel
+from faster_whisper import BatchedInferencePipeline, WhisperModel
 import tempfile
 import os
 import asyncio
-from typing import Optional
-from telegram import Bot
+import time
+from typing import Dict, Optional, Tuple
+from telegram import Bot, File
 from config import get_logger
 
 logger = get_logger(__name__)
 
 # Load Whisper model once at module level
 _whisper_model = None
+_whisper_pipeline = None
+
+# Number of 30-second audio windows decoded together by the batched pipeline
+WHISPER_BATCH_SIZE = 8
+
+# Number of parallel transcriptions the model is configured for; the semaphore
+# keeps concurrent run_in_executor calls from exceeding it.
+WHISPER_NUM_WORKERS = 2
+WHISPER_SEM = asyncio.Semaphore(WHISPER_NUM_WORKERS)
+
+# Telegram keeps a file_path valid for about an hour; cache File objects for
+# half that so retries of the same voice message skip the get_file round-trip.
+_FILE_CACHE_TTL = 1800
+_FILE_CACHE_MAXSIZE = 1024
+_file_cache: Dict[str, Tuple[float, File]] = {}
+
+# Keep downloaded audio on tmpfs (RAM) when available to skip disk I/O
+_TEMP_DIR = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
 
 def _get_whisper_model():
-    """Get or load the Whisper model (lazy loading)."""
-    global _whisper_model
-    if _whisper_model is None:
+    """Get or load the batched Whisper pipeline (lazy loading)."""
+    global _whisper_model, _whisper_pipeline
+    if _whisper_pipeline is None:
         logger.info("Loading faster-whisper model (base)...")
-        _whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
+        _whisper_model = WhisperModel(
+            "base", device="cpu", compute_type="int8", num_workers=WHISPER_NUM_WORKERS
+        )
+        _whisper_pipeline = BatchedInferencePipeline(model=_whisper_model)
         logger.info("Faster-whisper model loaded successfully")
-    return _whisper_model
+    return _whisper_pipeline
+
+
+async def _get_file_cached(bot: Bot, file_id: str) -> File:
+    """Return the Telegram File for file_id, reusing a recent lookup if possible."""
+    now = time.monotonic()
+    cached = _file_cache.get(file_id)
+    if cached and now - cached[0] < _FILE_CACHE_TTL:
+        logger.debug(f"File info cache hit for file_id: {file_id}")
+        return cached[1]
+
+    file = await bot.get_file(file_id)
+    _file_cache.pop(file_id, None)
+    if len(_file_cache) >= _FILE_CACHE_MAXSIZE:
+        # Dicts keep insertion order, so the first key is the oldest entry
+        _file_cache.pop(next(iter(_file_cache)))
+    _file_cache[file_id] = (now, file)
+    return file
+
+
+def _transcribe_file(model, file_path: str) -> str:
+    """Run Whisper and consume the lazy segment generator (blocking)."""
+    segments, info = model.transcribe(file_path, batch_size=WHISPER_BATCH_SIZE)
+    return " ".join(segment.text for segment in segments).strip()
 
 
 async def transcribe_voice_message(file_id: str, bot: Bot) -> Optional[str]:
@@ -37,35 +82,33 @@ async def transcribe_voice_message(file_id: str, bot: Bot) -> Optional[str]:
     Returns:
         Transcribed text or None if transcription fails
     """
-    temp_file_path = None
-    
     try:
         logger.debug(f"Starting transcription for file_id: {file_id}")
         
-        # Get file info from Telegram
-        file = await bot.get_file(file_id)
+        # Get file info from Telegram (cached per file_id)
+        file = await _get_file_cached(bot, file_id)
         logger.debug(f"Got file info: {file.file_path}")
         
-        # Create temporary file for audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as temp_file:
-            temp_file_path = temp_file.name
-            logger.debug(f"Created temp file: {temp_file_path}")
-        
-        # Download the voice message
-        await file.download_to_drive(temp_file_path)
-        logger.debug(f"Downloaded voice message to: {temp_file_path}")
-        
-        # Transcribe using faster-whisper in a separate thread to avoid blocking
-        loop = asyncio.get_event_loop()
-        model = _get_whisper_model()
-        
-        logger.debug("Starting faster-whisper transcription...")
-        segments, info = await loop.run_in_executor(
-            None, model.transcribe, temp_file_path
-        )
-        
-        # Combine all segments into a single text
-        transcribed_text = " ".join([segment.text for segment in segments]).strip()
+        # delete=True unlinks the file when the block exits (even on errors),
+        # so no separate exists()/unlink() cleanup is needed
+        with tempfile.NamedTemporaryFile(delete=True, suffix=".ogg", dir=_TEMP_DIR) as temp_file:
+            logger.debug(f"Created temp file: {temp_file.name}")
+            
+            # Download the voice message into the open temp file
+            await file.download_to_memory(out=temp_file)
+            temp_file.flush()
+            logger.debug(f"Downloaded voice message to: {temp_file.name}")
+            
+            # Transcribe using faster-whisper in a separate thread to avoid blocking
+            loop = asyncio.get_event_loop()
+            model = _get_whisper_model()
+            
+            logger.debug("Starting faster-whisper transcription...")
+            # Segments are decoded lazily, so the join runs inside the executor too
+            async with WHISPER_SEM:
+                transcribed_text = await loop.run_in_executor(
+                    None, _transcribe_file, model, temp_file.name
+                )
         logger.info(f"Transcription completed: '{transcribed_text[:100]}...'")
         
         return transcribed_text if transcribed_text else None
@@ -73,22 +116,13 @@ async def transcribe_voice_message(file_id: str, bot: Bot) -> Optional[str]:
     except Exception as e:
         logger.error(f"Error transcribing voice message {file_id}: {e}", exc_info=True)
         return None
-        
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-                logger.debug(f"Cleaned up temp file: {temp_file_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to cleanup temp file: {cleanup_error}")
 
 
 async def process_voice_message_with_agent(transcribed_text: str, agent, user_id: int, chat_id: int) -> str:
     """
     Process transcribed text through the agent and return response.
     """
-    from agent.agent_helpers import ainvoke_agent
+    from agent.agent_helpers import abatch_invoke_agent
 
     voice_prefix = "the user said via voice message: "
-    return await ainvoke_agent(agent, voice_prefix + transcribed_text, user_id, chat_id)
+    return await abatch_invoke_agent(agent, voice_prefix + transcribed_text, user_id, chat_id)
@@ -1,8 +1,13 @@
 import asyncio
+import copy
 import logging
 import os
+import re
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from functools import lru_cache, wraps
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from telethon import TelegramClient, events
 from telethon.tl.types import Channel, Chat, User, Message
 from telethon.errors import SessionPasswordNeededError, FloodWaitError
@@ -16,6 +21,73 @@ from config import setup_development_logging, get_logger
 setup_development_logging()
 logger = get_logger(__name__)
 
+# Resolved channel peers kept per collector; entries are evicted LRU-first
+_ENTITY_CACHE_MAXSIZE = 1024
+# How long get_channel_info results (participant counts etc.) stay fresh
+_CHANNEL_INFO_TTL = 300
+# Raw messages parsed (and their senders resolved) together when streaming
+_PARSE_CHUNK_SIZE = 100
+# Media class -> name, filled lazily as new media types are seen
+_MEDIA_TYPE_CACHE: Dict[type, str] = {}
+# "YYYY-MM-DD" with optional " HH:MM:SS"/"THH:MM:SS" and a trailing UTC offset
+_DATE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})(?:[ T](\d{2}:\d{2}:\d{2}))?(.*)$')
+
+class _AsyncRateLimiter:
+    """Token bucket allowing ``max_rate`` acquisitions per ``time_period`` seconds."""
+    
+    def __init__(self, max_rate: float, time_period: float = 1.0):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._tokens = float(max_rate)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                refill = (now - self._last) * self.max_rate / self.time_period
+                self._tokens = min(self.max_rate, self._tokens + refill)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.time_period / self.max_rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def telegram_safe(default):
+    """
+    Shared error handling for collector methods taking a channel username.
+    
+    Strips a leading ``@`` from the channel, sleeps out a FloodWaitError and
+    retries once, and logs any other failure, returning ``default`` instead
+    of raising.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(self, channel_username: str, *args, **kwargs):
+            channel_username = channel_username.removeprefix('@')
+            try:
+                try:
+                    return await fn(self, channel_username, *args, **kwargs)
+                except FloodWaitError as e:
+                    logger.warning(f"Flood wait error: need to wait {e.seconds} seconds, retrying once")
+                    await asyncio.sleep(e.seconds)
+                return await fn(self, channel_username, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"Error in {fn.__name__} for @{channel_username}: {e}")
+                # Copy so callers mutating the result can't alter the shared default
+                return copy.copy(default)
+        return wrapper
+    return decorator
+
+
 class TelethonChannelCollector:
     def __init__(self):
         """Initialize the Telethon client for collecting messages from channels."""
@@ -29,6 +101,13 @@ class TelethonChannelCollector:
         # Create the client
         self.client = TelegramClient('session_name', self.api_id, self.api_hash)
         
+        # Shared across concurrent fetches; only blocks once the bucket is empty
+        self.limiter = _AsyncRateLimiter(max_rate=20, time_period=1)
+        
+        # Username -> input peer, so each channel is resolved once per process
+        self._entity_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._channel_info_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        
     async def start_client(self):
         """Start the Telegram client and handle authentication."""
         try:
@@ -53,29 +132,75 @@ class TelethonChannelCollector:
             logger.error(f"Error starting client: {e}")
             return False
     
+    async def _resolve(self, channel_username: str):
+        """Resolve a channel username to an input peer, caching the result."""
+        key = channel_username.lstrip('@').lower()
+        peer = self._entity_cache.get(key)
+        if peer is not None:
+            self._entity_cache.move_to_end(key)
+            return peer
+        
+        peer = await self.client.get_input_entity(key)
+        self._entity_cache[key] = peer
+        if len(self._entity_cache) > _ENTITY_CACHE_MAXSIZE:
+            self._entity_cache.popitem(last=False)
+        return peer
+    
+    @telegram_safe(None)
     async def get_channel_info(self, channel_username: str) -> Optional[Dict[str, Any]]:
         """Get information about a channel."""
-        try:
-            entity = await self.client.get_entity(channel_username)
-            
-            if isinstance(entity, Channel):
-                return {
-                    'id': entity.id,
-                    'title': entity.title,
-                    'username': entity.username,
-                    'participants_count': entity.participants_count,
-                    'description': entity.about if hasattr(entity, 'about') else None,
-                    'is_broadcast': entity.broadcast,
-                    'is_megagroup': entity.megagroup
-                }
-            else:
-                logger.warning(f"{channel_username} is not a channel")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error getting channel info for {channel_username}: {e}")
+        key = channel_username.lower()
+        cached = self._channel_info_cache.get(key)
+        if cached and time.monotonic() - cached[0] < _CHANNEL_INFO_TTL:
+            return cached[1]
+        
+        entity = await self.client.get_entity(await self._resolve(channel_username))
+        
+        if isinstance(entity, Channel):
+            info = {
+                'id': entity.id,
+                'title': entity.title,
+                'username': entity.username,
+                'participants_count': entity.participants_count,
+                'description': entity.about if hasattr(entity, 'about') else None,
+                'is_broadcast': entity.broadcast,
+                'is_megagroup': entity.megagroup
+            }
+            self._channel_info_cache[key] = (time.monotonic(), info)
+            return info
+        else:
+            logger.warning(f"{channel_username} is not a channel")
             return None
     
+    async def iter_messages_from_channel(
+        self, 
+        channel_username: str, 
+        limit: int = 100,
+        offset_date: Optional[datetime] = None,
+        min_id: int = 0,
+        max_id: int = 0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream parsed messages from a specific channel, newest first.
+        
+        Args:
+            channel_username: Channel username (with or without @)
+            limit: Maximum number of messages to retrieve
+            offset_date: Get messages before this date
+            min_id: Get messages with ID greater than this
+            max_id: Get messages with ID less than this
+        """
+        raw_messages = self.client.iter_messages(
+            await self._resolve(channel_username),
+            limit=limit,
+            offset_date=offset_date,
+            min_id=min_id,
+            max_id=max_id
+        )
+        async for message_data in self._iter_parsed(raw_messages):
+            yield message_data
+    
+    @telegram_safe([])
     async def get_messages_from_channel(
         self, 
         channel_username: str, 
@@ -94,51 +219,48 @@ class TelethonChannelCollector:
             min_id: Get messages with ID greater than this
             max_id: Get messages with ID less than this
         """
-        try:
-            # Clean channel username
-            if channel_username.startswith('@'):
-                channel_username = channel_username[1:]
-            
-            logger.info(f"Fetching messages from channel: @{channel_username}")
-            
-            messages = []
-            async for message in self.client.iter_messages(
-                channel_username,
-                limit=limit,
-                offset_date=offset_date,
-                min_id=min_id,
-                max_id=max_id
-            ):
-                message_data = await self._parse_message(message)
-                if message_data:
-                    messages.append(message_data)
-            
-            logger.info(f"Retrieved {len(messages)} messages from @{channel_username}")
-            return messages
-            
-        except FloodWaitError as e:
-            logger.warning(f"Flood wait error: need to wait {e.seconds} seconds")
-            await asyncio.sleep(e.seconds)
-            return []
-        except Exception as e:
-            logger.error(f"Error fetching messages from {channel_username}: {e}")
-            return []
+        logger.info(f"Fetching messages from channel: @{channel_username}")
+        
+        messages = [
+            message_data async for message_data in self.iter_messages_from_channel(
+                channel_username, limit, offset_date, min_id, max_id
+            )
+        ]
+        
+        logger.info(f"Retrieved {len(messages)} messages from @{channel_username}")
+        return messages
     
     async def get_messages_from_multiple_channels(
         self, 
         channel_usernames: List[str], 
-        limit_per_channel: int = 50
+        limit_per_channel: int = 50,
+        concurrency: int = 5
     ) -> Dict[str, List[Dict[str, Any]]]:
-        """Get messages from multiple channels."""
-        all_messages = {}
+        """
+        Get messages from multiple channels.
         
-        for channel in channel_usernames:
-            logger.info(f"Processing channel: {channel}")
-            messages = await self.get_messages_from_channel(channel, limit_per_channel)
-            all_messages[channel] = messages
-            
-            # Small delay to avoid hitting rate limits
-            await asyncio.sleep(1)
+        Channels are fetched concurrently, with at most ``concurrency``
+        requests in flight at once to stay clear of rate limits.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def _fetch_one(channel: str):
+            async with sem, self.limiter:
+                logger.info(f"Processing channel: {channel}")
+                return channel, await self.get_messages_from_channel(channel, limit_per_channel)
+        
+        results = await asyncio.gather(
+            *(_fetch_one(channel) for channel in channel_usernames),
+            return_exceptions=True
+        )
+        
+        all_messages = {}
+        for channel, result in zip(channel_usernames, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching messages from {channel}: {result}")
+                all_messages[channel] = []
+            else:
+                all_messages[channel] = result[1]
         
         return all_messages
     
@@ -151,6 +273,35 @@ class TelethonChannelCollector:
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
         return await self.get_messages_after_date(channel_username, cutoff_time)
     
+    async def iter_messages_after_date(
+        self,
+        channel_username: str,
+        after_date: datetime,
+        limit: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream messages published after a specific date, newest first.
+        
+        Args:
+            channel_username: Channel username (with or without @)
+            after_date: Only get messages published after this date
+            limit: Maximum number of messages to check (default 1000)
+        """
+        peer = await self._resolve(channel_username)
+        
+        async def after_cutoff():
+            # Walk newest to oldest so a capped read keeps the most recent
+            # messages, and stop at the first one from before the cutoff
+            async for message in self.client.iter_messages(peer, limit=limit):
+                if message.date <= after_date:
+                    logger.info(f"Reached messages older than {after_date.isoformat()}, stopping search")
+                    break
+                yield message
+        
+        async for message_data in self._iter_parsed(after_cutoff()):
+            yield message_data
+    
+    @telegram_safe([])
     async def get_messages_after_date(
         self,
         channel_username: str,
@@ -168,52 +319,72 @@ class TelethonChannelCollector:
         Returns:
             List of messages published after the specified date
         """
-        try:
-            # Clean channel username
-            if channel_username.startswith('@'):
-                channel_username = channel_username[1:]
-            
-            logger.info(f"Fetching messages from @{channel_username} after {after_date.isoformat()}")
-            
-            messages = []
-            message_count = 0
-            
-            async for message in self.client.iter_messages(
-                channel_username,
-                limit=limit
-            ):
-                message_count += 1
-                
-                # Check if message is after the specified date
-                if message.date > after_date:
-                    message_data = await self._parse_message(message)
-                    if message_data:
-                        messages.append(message_data)
-                else:
-                    # Since messages are ordered from newest to oldest,
-                    # if we encounter a message older than our cutoff date,
-                    # we can stop searching
-                    logger.info(f"Reached messages older than {after_date.isoformat()}, stopping search")
-                    break
-            
-            logger.info(f"Retrieved {len(messages)} messages from @{channel_username} after {after_date.isoformat()}")
-            logger.info(f"Checked {message_count} total messages")
-            return messages
-            
-        except FloodWaitError as e:
-            logger.warning(f"Flood wait error: need to wait {e.seconds} seconds")
-            await asyncio.sleep(e.seconds)
-            return []
-        except Exception as e:
-            logger.error(f"Error fetching messages from {channel_username} after date: {e}")
-            return []
+        logger.info(f"Fetching messages from @{channel_username} after {after_date.isoformat()}")
+        
+        messages = [
+            message_data async for message_data in self.iter_messages_after_date(
+                channel_username, after_date, limit
+            )
+        ]
+        
+        logger.info(f"Retrieved {len(messages)} messages from @{channel_username} after {after_date.isoformat()}")
+        return messages
+    
+    async def iter_messages_between_dates(
+        self,
+        channel_username: str,
+        start_date: datetime,
+        end_date: datetime,
+        limit: int = 2000,
+        min_id: int = 0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream messages published between two dates, oldest first.
+        
+        When ``limit`` cuts the window short, the newest messages in it are
+        the ones kept.
+        
+        Args:
+            channel_username: Channel username (with or without @)
+            start_date: Get messages after this date
+            end_date: Get messages before this date
+            limit: Maximum number of messages to check
+            min_id: Only check messages with ID greater than this, e.g. the
+                    newest ID seen by a previous run
+        """
+        peer = await self._resolve(channel_username)
+        
+        # Walk back from end_date so a capped read keeps the most recent
+        # messages, stopping at the first one from before start_date
+        window = []
+        async for message in self.client.iter_messages(
+            peer,
+            limit=limit,
+            offset_date=end_date,
+            min_id=min_id
+        ):
+            if message.date < start_date:
+                logger.info(f"Reached messages older than {start_date.isoformat()}, stopping search")
+                break
+            window.append(message)
+        # At most ``limit`` messages, so flipping them is cheaper than a sort
+        window.reverse()
+        
+        async def in_range():
+            for message in window:
+                yield message
+        
+        async for message_data in self._iter_parsed(in_range()):
+            yield message_data
     
+    @telegram_safe([])
     async def get_messages_between_dates(
         self,
         channel_username: str,
         start_date: datetime,
         end_date: datetime,
-        limit: int = 2000
+        limit: int = 2000,
+        min_id: int = 0
     ) -> List[Dict[str, Any]]:
         """
         Get messages from a channel between two specific dates.
@@ -223,60 +394,83 @@ class TelethonChannelCollector:
             start_date: Get messages after this date
             end_date: Get messages before this date
             limit: Maximum number of messages to check
+            min_id: Only check messages with ID greater than this, e.g. the
+                    newest ID seen by a previous run
         
         Returns:
             List of messages between the specified dates
         """
+        logger.info(f"Fetching messages from @{channel_username} between {start_date.isoformat()} and {end_date.isoformat()}")
+        
+        messages = [
+            message_data async for message_data in self.iter_messages_between_dates(
+                channel_username, start_date, end_date, limit, min_id
+            )
+        ]
+        
+        logger.info(f"Retrieved {len(messages)} messages from @{channel_username} between dates")
+        return messages
+    
+    async def _iter_parsed(self, raw_messages: AsyncIterator[Message]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parse a stream of raw messages in chunks of ``_PARSE_CHUNK_SIZE``.
+        
+        Only one chunk of Telethon objects is held at a time, while senders
+        are still resolved per chunk rather than per message.
+        """
+        chunk = []
+        async for message in raw_messages:
+            chunk.append(message)
+            if len(chunk) >= _PARSE_CHUNK_SIZE:
+                for message_data in await self._parse_messages(chunk):
+                    yield message_data
+                chunk = []
+        if chunk:
+            for message_data in await self._parse_messages(chunk):
+                yield message_data
+    
+    async def _parse_messages(self, messages: List[Message]) -> List[Dict[str, Any]]:
+        """
+        Parse a batch of messages, resolving their senders together.
+        
+        Senders that came back with the messages are used directly; any that
+        are missing are fetched in a single get_entity call rather than one
+        get_sender() round-trip per message.
+        """
+        senders = {m.sender_id: m.sender for m in messages if m.sender is not None}
+        missing = list({m.sender_id for m in messages if m.sender_id and m.sender_id not in senders})
+        if missing:
+            try:
+                senders.update(zip(missing, await self.client.get_entity(missing)))
+            except Exception as e:
+                logger.warning(f"Could not resolve {len(missing)} senders: {e}")
+        
+        parsed = []
+        for message in messages:
+            message_data = self._parse_message_sync(message, senders.get(message.sender_id))
+            if message_data:
+                parsed.append(message_data)
+        return parsed
+    
+    async def _parse_message(self, message: Message) -> Optional[Dict[str, Any]]:
+        """Parse a single Telegram message, fetching its sender if needed."""
+        if not message:
+            return None
+        
         try:
-            # Clean channel username
-            if channel_username.startswith('@'):
-                channel_username = channel_username[1:]
-            
-            logger.info(f"Fetching messages from @{channel_username} between {start_date.isoformat()} and {end_date.isoformat()}")
-            
-            messages = []
-            message_count = 0
-            
-            async for message in self.client.iter_messages(
-                channel_username,
-                limit=limit,
-                offset_date=end_date  # Start from end_date and go backwards
-            ):
-                message_count += 1
-                
-                # Check if message is within our date range
-                if start_date <= message.date <= end_date:
-                    message_data = await self._parse_message(message)
-                    if message_data:
-                        messages.append(message_data)
-                elif message.date < start_date:
-                    # We've gone too far back, stop searching
-                    logger.info(f"Reached messages older than {start_date.isoformat()}, stopping search")
-                    break
-            
-            # Sort messages by date (oldest first)
-            messages.sort(key=lambda x: x['date'])
-            
-            logger.info(f"Retrieved {len(messages)} messages from @{channel_username} between dates")
-            logger.info(f"Checked {message_count} total messages")
-            return messages
-            
-        except FloodWaitError as e:
-            logger.warning(f"Flood wait error: need to wait {e.seconds} seconds")
-            await asyncio.sleep(e.seconds)
-            return []
+            sender = await message.get_sender()
         except Exception as e:
-            logger.error(f"Error fetching messages from {channel_username} between dates: {e}")
-            return []
+            logger.error(f"Error getting sender for message {message.id}: {e}")
+            return None
+        return self._parse_message_sync(message, sender)
     
-    async def _parse_message(self, message: Message) -> Optional[Dict[str, Any]]:
+    def _parse_message_sync(self, message: Message, sender) -> Optional[Dict[str, Any]]:
         """Parse a Telegram message into a dictionary."""
         if not message:
             return None
         
         try:
             # Get sender information
-            sender = await message.get_sender()
             sender_info = {}
             
             if isinstance(sender, User):
@@ -295,6 +489,17 @@ class TelethonChannelCollector:
                     'username': sender.username
                 }
             
+            media = message.media
+            if media:
+                media_cls = type(media)
+                media_type = _MEDIA_TYPE_CACHE.get(media_cls)
+                if media_type is None:
+                    media_type = _MEDIA_TYPE_CACHE.setdefault(media_cls, media_cls.__name__)
+            else:
+                media_type = None
+            replies = message.replies
+            edit_date = message.edit_date
+            
             return {
                 'id': message.id,
                 'text': message.text or '',  # Handle messages without text
@@ -302,12 +507,12 @@ class TelethonChannelCollector:
                 'sender': sender_info,
                 'views': message.views,
                 'forwards': message.forwards,
-                'replies': message.replies.replies if message.replies else 0,
+                'replies': replies.replies if replies else 0,
                 'is_reply': message.is_reply,
                 'reply_to_msg_id': message.reply_to_msg_id,
-                'media': bool(message.media),
-                'media_type': type(message.media).__name__ if message.media else None,
-                'edit_date': message.edit_date.isoformat() if message.edit_date else None,
+                'media': bool(media),
+                'media_type': media_type,
+                'edit_date': edit_date.isoformat() if edit_date else None,
                 'grouped_id': message.grouped_id,
                 'from_scheduled': message.from_scheduled
             }
@@ -316,7 +521,9 @@ class TelethonChannelCollector:
             logger.error(f"Error parsing message {message.id}: {e}")
             return None
     
-    def parse_date_string(self, date_string: str) -> datetime:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def parse_date_string(date_string: str) -> datetime:
         """
         Parse various date string formats into datetime objects.
         
@@ -326,23 +533,12 @@ class TelethonChannelCollector:
         - With timezone: "2025-08-08 12:00:00+00:00"
         """
         try:
-            # Try different date formats
-            formats = [
-                "%Y-%m-%d %H:%M:%S",
-                "%Y-%m-%d",
-                "%Y-%m-%dT%H:%M:%S",
-                "%Y-%m-%d %H:%M:%S%z",
-                "%Y-%m-%dT%H:%M:%S%z"
-            ]
+            match = _DATE_RE.match(date_string)
+            if not match:
+                raise ValueError(f"Unable to parse date string: {date_string}")
             
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_string, fmt)
-                except ValueError:
-                    continue
-            
-            # If no format matches, raise an error
-            raise ValueError(f"Unable to parse date string: {date_string}")
+            date_part, time_part, tz_part = match.groups()
+            return datetime.fromisoformat(f"{date_part}T{time_part or '00:00:00'}{tz_part}")
             
         except Exception as e:
             logger.error(f"Error parsing date string '{date_string}': {e}")
@@ -352,16 +548,28 @@ class TelethonChannelCollector:
         """Listen for new messages in real-time from specified channels."""
         logger.info(f"Starting to listen for new messages from: {channel_usernames}")
         
-        @self.client.on(events.NewMessage(chats=channel_usernames))
+        # Resolve once up front so the event filter compares peers directly
+        peers = await asyncio.gather(*(self._resolve(c) for c in channel_usernames))
+        # Chat entities by ID, so get_chat() is only awaited for a chat's first message
+        chats: Dict[int, Any] = {}
+        
         async def new_message_handler(event):
             message_data = await self._parse_message(event.message)
             if message_data:
-                logger.info(f"New message from {event.chat.username or event.chat.title}: {message_data['text'][:100]}...")
+                chat = chats.get(event.chat_id)
+                if chat is None:
+                    chat = chats[event.chat_id] = await event.get_chat()
+                chat_name = chat.username or chat.title
+                logger.info(f"New message from {chat_name}: {message_data['text'][:100]}...")
                 # Here you can process the new message as needed
-                await self.process_new_message(message_data, event.chat)
+                await self.process_new_message(message_data, chat)
         
-        logger.info("Listening for new messages... Press Ctrl+C to stop")
-        await self.client.run_until_disconnected()
+        self.client.add_event_handler(new_message_handler, events.NewMessage(chats=peers))
+        try:
+            logger.info("Listening for new messages... Press Ctrl+C to stop")
+            await self.client.run_until_disconnected()
+        finally:
+            self.client.remove_event_handler(new_message_handler)
     
     async def process_new_message(self, message_data: Dict[str, Any], chat):
         """Process new messages as they arrive. Override this method for custom processing."""
@@ -373,6 +581,22 @@ class TelethonChannelCollector:
         print(f"Views: {message_data['views']}")
         print("------------------\n")
     
+    async def iter_search_messages(
+        self, 
+        channel_username: str, 
+        query: str, 
+        limit: int = 100
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream messages in a channel matching a search query."""
+        raw_messages = self.client.iter_messages(
+            await self._resolve(channel_username),
+            search=query,
+            limit=limit
+        )
+        async for message_data in self._iter_parsed(raw_messages):
+            yield message_data
+    
+    @telegram_safe([])
     async def search_messages(
         self, 
         channel_username: str, 
@@ -380,25 +604,16 @@ class TelethonChannelCollector:
         limit: int = 100
     ) -> List[Dict[str, Any]]:
         """Search for specific messages in a channel."""
-        try:
-            logger.info(f"Searching for '{query}' in @{channel_username}")
-            
-            messages = []
-            async for message in self.client.iter_messages(
-                channel_username,
-                search=query,
-                limit=limit
-            ):
-                message_data = await self._parse_message(message)
-                if message_data:
-                    messages.append(message_data)
-            
-            logger.info(f"Found {len(messages)} messages matching '{query}'")
-            return messages
-            
-        except Exception as e:
-            logger.error(f"Error searching messages: {e}")
-            return []
+        logger.info(f"Searching for '{query}' in @{channel_username}")
+        
+        messages = [
+            message_data async for message_data in self.iter_search_messages(
+                channel_username, query, limit
+            )
+        ]
+        
+        logger.info(f"Found {len(messages)} messages matching '{query}'")
+        return messages
     
     async def close(self):
         """Close the Telegram client."""
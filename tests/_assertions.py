@@ -0,0 +1,22 @@
+"""
+Shape checks shared by the agent workflow tests.
+
+Each helper asserts the invariant every agent test ends with and returns the
+part of the response the test goes on to inspect.
+"""
+
+
+def assert_agent_messages(response) -> list:
+    """Assert a LangGraph ``{"messages": [...]}`` response and return the messages."""
+    assert type(response) is dict, f"expected a dict response, got {type(response).__name__}"
+    messages = response.get("messages")
+    assert messages, f"response has no messages: {response!r}"
+    return messages
+
+
+def assert_agent_reply(response) -> str:
+    """Assert a messages response that ends in a text reply and return the text."""
+    reply = assert_agent_messages(response)[-1]
+    assert reply.type == "ai", f"last message is not the agent's reply: {reply!r}"
+    assert isinstance(reply.content, str), f"reply has no text content: {reply!r}"
+    return reply.content
@@ -0,0 +1,59 @@
+"""
+Dict-backed stand-in for the APScheduler scheduler used by the task tools.
+
+The scheduler tests only schedule, list and cancel jobs; none of them wait for
+a job to fire. Jobs are kept in a plain dict keyed by ID, so every operation
+is a lookup and nothing touches APScheduler's locks, executors or job stores.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from apscheduler.jobstores.base import ConflictingIdError, JobLookupError
+
+
+@dataclass
+class FakeJob:
+    """The parts of an APScheduler Job the task tools read."""
+    id: str
+    name: str
+    func: Callable
+    trigger: Any
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeScheduler:
+    """Implements the add/get/remove job calls the task tools make."""
+
+    def __init__(self):
+        self._jobs: Dict[str, FakeJob] = {}
+
+    def add_job(self, func, trigger=None, args=None, kwargs=None, id=None,
+                name=None, replace_existing=False, **options) -> FakeJob:
+        job_id = id or f"job_{len(self._jobs)}"
+        if job_id in self._jobs and not replace_existing:
+            raise ConflictingIdError(job_id)
+        job = FakeJob(
+            id=job_id,
+            name=name or getattr(func, "__name__", job_id),
+            func=func,
+            trigger=trigger,
+            args=tuple(args or ()),
+            kwargs=dict(kwargs or {}),
+        )
+        self._jobs[job_id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[FakeJob]:
+        return self._jobs.get(job_id)
+
+    def get_jobs(self) -> List[FakeJob]:
+        return list(self._jobs.values())
+
+    def remove_job(self, job_id: str) -> None:
+        if self._jobs.pop(job_id, None) is None:
+            raise JobLookupError(job_id)
+
+    def remove_all_jobs(self) -> None:
+        self._jobs.clear()
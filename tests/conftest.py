@@ -3,89 +3,354 @@ Shared test fixtures and configuration for the personal assistant test suite.
 """
 
 import pytest
-import tempfile
+import itertools
 import os
 import sys
-from unittest.mock import patch, MagicMock
-from sqlalchemy import create_engine, text
+import tempfile
+import time
+import types
+from contextlib import contextmanager
+from typing import Dict
+from unittest.mock import patch, AsyncMock, MagicMock
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# Each test process (every pytest-xdist worker included) gets its own databases,
+# so parallel workers never share the in-memory test database or the tools'
+# SQLite file, and no run writes to the real personal_assistant.db
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+TOOLS_DB_PATH = os.path.join(
+    tempfile.gettempdir(), f"personal_assistant_{XDIST_WORKER}_{os.getpid()}.db"
+)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{TOOLS_DB_PATH}")
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-network", action="store_true", default=False,
+        help="run tests marked network, which call real external APIs",
+    )
 
-# Add project root to path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.insert(0, project_root)
 
-from database.models import Base, create_database_engine, create_tables, get_session_factory
-from agent.tools.planner_tools.database_tools import get_database_tools
+def pytest_collection_modifyitems(config, items):
+    """Skip network tests unless --run-network is given."""
+    # A skip rather than an addopts -m filter, which any -m on the command line replaces
+    if config.getoption("--run-network"):
+        return
+    skip_network = pytest.mark.skip(reason="calls real external APIs; use --run-network")
+    for item in items:
+        if "network" in item.keywords:
+            item.add_marker(skip_network)
+
+
+def pytest_unconfigure(config):
+    """Delete this process's tools database file once pytest is done."""
+    # A hook rather than a session fixture: importing the tools during
+    # collection alone can create the file, also in the xdist controller
+    tools_db = sys.modules.get("agent.tools.planner_tools.database_tools")
+    if tools_db is not None and tools_db._engine is not None:
+        tools_db._engine.dispose()
+    if os.path.exists(TOOLS_DB_PATH):
+        os.remove(TOOLS_DB_PATH)
 
 
 @pytest.fixture(scope="session")
 def test_database_engine():
-    """Create a test database engine for the session."""
-    # Create temporary database file
-    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
-        test_db_path = tmp.name
+    """Create an in-memory test database engine for the session."""
+    # Imported here so collecting tests that never touch the database stays cheap
+    from database.models import create_database_engine, create_tables
+    
+    engine = create_database_engine(
+        f'sqlite:///file:testdb_{XDIST_WORKER}?mode=memory&cache=shared&uri=true'
+    )
+    
+    # pysqlite's own transaction handling breaks SAVEPOINTs; let SQLAlchemy
+    # emit BEGIN itself so test_session can roll back to one
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
     
-    # Create engine and tables
-    engine = create_database_engine(f'sqlite:///{test_db_path}')
+    # create_database_engine gives memory databases a StaticPool, so the one
+    # connection (and the database with it) lives for the whole session
     create_tables(engine)
     
     yield engine
     
     # Cleanup
     engine.dispose()
-    if os.path.exists(test_db_path):
-        os.unlink(test_db_path)
+
+
+@pytest.fixture(scope="session")
+def test_session_factory(test_database_engine):
+    """Session factory shared by every test_session."""
+    from database.models import get_session_factory
+    return get_session_factory(test_database_engine)
 
 
 @pytest.fixture
-def test_session(test_database_engine):
-    """Create a fresh database session for each test."""
-    SessionFactory = get_session_factory(test_database_engine)
-    session = SessionFactory()
+def test_session(test_database_engine, test_session_factory):
+    """
+    Create a database session for each test, rolled back at teardown.
+    
+    The session joins an outer transaction through a SAVEPOINT, so its
+    commit()/rollback() calls stay inside the test and nothing persists.
+    """
+    connection = test_database_engine.connect()
+    trans = connection.begin()
+    session = test_session_factory(bind=connection, join_transaction_mode="create_savepoint")
     
     yield session
     
-    # Cleanup after test - rollback and close
-    session.rollback()
     session.close()
+    trans.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope="class")
+def class_session(test_database_engine, test_session_factory):
+    """
+    Session shared by one test class, rolled back when the class finishes.
+    
+    Lets a class build an object graph once; pair it with a per-test
+    SAVEPOINT so individual tests still cannot see each other's changes.
+    """
+    connection = test_database_engine.connect()
+    trans = connection.begin()
+    session = test_session_factory(bind=connection, join_transaction_mode="create_savepoint")
     
-    # Clear all data between tests for complete isolation
-    with test_database_engine.connect() as conn:
-        trans = conn.begin()
+    yield session
+    
+    session.close()
+    trans.rollback()
+    connection.close()
+
+
+class FakeChatModel(GenericFakeChatModel):
+    """
+    Deterministic chat model for the agent tests; tool binding is a no-op.
+    
+    Replies found in ``script`` (keyed on the latest user message) are a
+    dict lookup; anything else comes from the ``messages`` queue.
+    """
+    
+    script: Dict[str, str] = {}
+    
+    def bind_tools(self, tools, **kwargs):
+        return self
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        last = messages[-1]
+        reply = self.script.get(last.content) if isinstance(last, HumanMessage) else None
+        if reply is not None:
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))])
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+DEFAULT_LLM_REPLY = (
+    "Hello TestUser! I can schedule tasks, search the web and Wikipedia, "
+    "and read the latest messages from Telegram channels."
+)
+
+# Canned turns for the conversation-memory tests
+LLM_SCRIPT = {
+    "My name is TestUser": "Nice to meet you, TestUser!",
+    "What's my name?": "Your name is TestUser.",
+}
+
+
+def _llm_messages(responses):
+    return iter([AIMessage(content=r) if isinstance(r, str) else r for r in responses])
+
+
+@pytest.fixture(scope="session")
+def fake_llm():
+    """Stand-in for Gemini that the test agent is built on."""
+    return FakeChatModel(
+        messages=itertools.cycle([AIMessage(content=DEFAULT_LLM_REPLY)]),
+        script=LLM_SCRIPT,
+    )
+
+
+@pytest.fixture
+def set_llm_responses(fake_llm):
+    """
+    Script the fake LLM's next replies for one test.
+    
+    Accepts strings (plain replies) or prepared AIMessages, e.g. ones
+    carrying tool_calls.
+    """
+    def _set(responses):
+        fake_llm.messages = _llm_messages(responses)
+    return _set
+
+
+# Graph steps allowed per agent run: one tool round trip (agent -> tools ->
+# agent) needs three steps and LangGraph stops once the count reaches the
+# limit, so allow four. Multi-tool tests raise it per call with
+# config={"recursion_limit": ...}
+AGENT_RECURSION_LIMIT = 4
+
+
+# Tool groups the test agent is built with. The specialized agents ('agents')
+# wrap their own LLM and the Todoist client, which the agent tests don't drive
+AGENT_TEST_TOOL_GROUPS = ("telegram", "scheduler", "search", "database")
+
+
+@pytest.fixture(scope="session")
+def agent_checkpointer():
+    """In-memory conversation memory owned by the test agent."""
+    from langgraph.checkpoint.memory import MemorySaver
+    return MemorySaver()
+
+
+@pytest.fixture(scope="session")
+def agent_executor(fake_llm, agent_checkpointer):
+    """
+    The main agent graph on the fake LLM, built once for the session.
+    
+    It has its own in-memory checkpointer, so tests never read or write
+    the developer's agent_memory.db.
+    """
+    # Imported here so collecting tests that never touch the agent stays cheap
+    from agent.main import build_agent
+    from agent.tools.tool_registry import register_tools
+    tools = [
+        tool
+        for group in AGENT_TEST_TOOL_GROUPS
+        for tool in register_tools(group, shared_llm=fake_llm)
+    ]
+    agent = build_agent(fake_llm, tools, agent_checkpointer)
+    # Bound each graph step so a pathological run fails fast
+    agent.step_timeout = 2
+    return agent.with_config(recursion_limit=AGENT_RECURSION_LIMIT)
+
+
+@pytest.fixture(autouse=True)
+def _reset_agent(request):
+    """Give every agent test the default LLM reply and empty scheduler/thread state."""
+    if "agent_executor" not in request.fixturenames:
+        yield
+        return
+    
+    request.getfixturevalue("fake_llm").messages = itertools.cycle(
+        [AIMessage(content=DEFAULT_LLM_REPLY)]
+    )
+    from agent.tools import task_scheduler
+    if task_scheduler.scheduler is not None:
+        task_scheduler.scheduler.remove_all_jobs()
+    # Only the test agent's own in-memory checkpointer is cleared
+    checkpointer = request.getfixturevalue("agent_checkpointer")
+    for thread_id in list(checkpointer.storage):
+        checkpointer.delete_thread(thread_id)
+    yield
+
+
+@pytest.fixture
+def step():
+    """
+    Time named phases of a test: ``with step("create_habit"): ...``.
+    
+    Each phase prints its duration, so slow steps show up under ``-s``.
+    """
+    @contextmanager
+    def _step(name: str):
+        start = time.perf_counter_ns()
         try:
-            # Delete all data from all tables (in reverse dependency order)
-            conn.execute(text("DELETE FROM habit_schedule_items"))
-            conn.execute(text("DELETE FROM task_schedule_items"))
-            conn.execute(text("DELETE FROM habit_completions"))
-            conn.execute(text("DELETE FROM habit_tags"))
-            conn.execute(text("DELETE FROM task_tags"))
-            conn.execute(text("DELETE FROM reminders"))
-            conn.execute(text("DELETE FROM time_entries"))
-            conn.execute(text("DELETE FROM task_chain_items"))
-            conn.execute(text("DELETE FROM task_chains"))
-            conn.execute(text("DELETE FROM daily_schedules"))
-            conn.execute(text("DELETE FROM habits"))
-            conn.execute(text("DELETE FROM tasks"))
-            conn.execute(text("DELETE FROM tags"))
-            trans.commit()
-        except Exception:
-            trans.rollback()
-            raise
+            yield
+        finally:
+            print(f"[{(time.perf_counter_ns() - start) / 1e6:.1f}ms] {name}")
+    return _step
+
+
+# The instant frozen_now pins the clock to (naive UTC)
+FROZEN_NOW = "2025-08-21 10:00:00"
+
+
+@pytest.fixture
+def frozen_now():
+    """Freeze the clock at FROZEN_NOW so time-based tests can use constant timestamps."""
+    from freezegun import freeze_time
+    with freeze_time(FROZEN_NOW) as frozen:
+        yield frozen
+
+
+@pytest.fixture
+def isolated_scheduler(monkeypatch):
+    """
+    A fresh dict-backed FakeScheduler in place of the global scheduler.
+    
+    The tests only schedule, list and cancel jobs, so APScheduler's
+    triggers, executors and job stores are never exercised.
+    """
+    from tests._fake_scheduler import FakeScheduler
+    from agent.tools import task_scheduler
+    
+    sched = FakeScheduler()
+    monkeypatch.setattr(task_scheduler, "scheduler", sched)
+    return sched
+
+
+def _stub_module(name: str) -> types.ModuleType:
+    """A module whose every attribute is a MagicMock."""
+    module = types.ModuleType(name)
+    module.__getattr__ = lambda attr: MagicMock(name=f"{name}.{attr}")
+    return module
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _stub_search_backends():
+    """
+    Stand in for the DuckDuckGo and Wikipedia client libraries.
+    
+    LangChain's search wrappers import them when constructed; the tests patch
+    the tool classes, so the real clients are never needed and their import
+    chains (HTTP clients, HTML parsers) are skipped.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        for name in ("duckduckgo_search", "wikipedia"):
+            mp.setitem(sys.modules, name, _stub_module(name))
+        yield
+
+
+@pytest.fixture
+def mock_collector(monkeypatch):
+    """Replace the scraper tool's TelethonChannelCollector with an AsyncMock instance."""
+    instance = AsyncMock()
+    monkeypatch.setattr(
+        "agent.tools.telegram_scraper.TelethonChannelCollector",
+        MagicMock(return_value=instance),
+    )
+    return instance
 
 
 @pytest.fixture
-def database_tools():
-    """Get the database tools for testing."""
-    return get_database_tools()
+def mock_search(monkeypatch):
+    """Replace DuckDuckGoSearchRun in the search tool with a canned MagicMock instance."""
+    instance = MagicMock()
+    instance.run.return_value = "Search results about Python"
+    monkeypatch.setattr("agent.tools.extra_tools.DuckDuckGoSearchRun", MagicMock(return_value=instance))
+    return instance
 
 
 @pytest.fixture
-def mock_telegram_client():
-    """Mock Telegram client for testing."""
-    with patch('telegram_scraper.collector.TelegramCollector') as mock:
-        mock_instance = MagicMock()
-        mock.return_value = mock_instance
-        yield mock_instance
+def mock_wiki(monkeypatch):
+    """Replace WikipediaQueryRun in the wiki tool with a canned MagicMock instance."""
+    instance = MagicMock()
+    instance.run.return_value = "Wikipedia article about Python"
+    monkeypatch.setattr("agent.tools.extra_tools.WikipediaQueryRun", MagicMock(return_value=instance))
+    return instance
 
 
 @pytest.fixture
@@ -1,200 +1,180 @@
 import pytest
-from unittest.mock import patch, MagicMock
-import asyncio
-from datetime import datetime, timedelta
-import os
+from datetime import datetime, timedelta, timezone
+import re
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from tests._assertions import assert_agent_messages, assert_agent_reply
+
+# Accepted agent replies, each matched in one case-insensitive pass
+PYTHON_REPLY_RE = re.compile(r"python|programming|language", re.IGNORECASE)
+TASK_LIST_REPLY_RE = re.compile(r"scheduled tasks|call mom", re.IGNORECASE)
+NEWS_REPLY_RE = re.compile(r"news|telegram|messages|channel", re.IGNORECASE)
+ERROR_REPLY_RE = re.compile(r"error|invalid|sorry|can't", re.IGNORECASE)
+MULTI_TOOL_REPLY_RE = re.compile(r"search|remind|schedule|meeting", re.IGNORECASE)
+
+THREAD = {"configurable": {"thread_id": "e2e"}}
+
+@pytest.fixture(autouse=True)
+def _telegram_token(monkeypatch):
+    """Run every test in this module with a dummy Telegram bot token."""
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test_token")
+
+
+def _ask(agent_executor, text, **config):
+    """Send one user message on the e2e thread and return the graph state."""
+    return agent_executor.invoke(
+        {"messages": [HumanMessage(content=text)]}, config={**THREAD, **config}
+    )
+
+
+def _tool_call(name, **args):
+    """An LLM turn that calls one tool with the given arguments."""
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_{name}"}])
+
+
+def _tool_results(response):
+    """Map each tool the agent ran to the text it returned."""
+    return {m.name: m.content for m in assert_agent_messages(response) if m.type == "tool"}
+
+
+def _in_an_hour():
+    """A run_at one hour from now in the scheduler's UTC+1 wall time."""
+    now = datetime.now(timezone(timedelta(hours=1)))
+    return (now + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
 
-# Skip entire module if no API key — these tests invoke the real LLM
-pytestmark = pytest.mark.skipif(
-    not os.getenv("GOOGLE_API_KEY"),
-    reason="GOOGLE_API_KEY not set — E2E tests require live Gemini credentials",
-)
 
 class TestEndToEndWorkflow:
     """End-to-end integration tests for the complete system."""
-    
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    @patch('agent.tools.extra_tools.DuckDuckGoSearchRun')
-    def test_search_and_respond_workflow(self, mock_search):
+
+    def test_search_and_respond_workflow(self, mock_search, set_llm_responses, agent_executor):
         """Test complete workflow: user asks question → agent searches → responds."""
-        from agent.main import agent_executor
-        
-        # Mock search results
-        mock_search_instance = MagicMock()
-        mock_search.return_value = mock_search_instance
-        mock_search_instance.run.return_value = "Python is a programming language created by Guido van Rossum."
-        
+        mock_search.run.return_value = "Python is a programming language created by Guido van Rossum."
+        set_llm_responses([
+            _tool_call("search_tool", query="Python programming language"),
+            "Python is a programming language created by Guido van Rossum.",
+        ])
+
         # Simulate user asking about Python
-        response = agent_executor.invoke({
-            "input": "What is Python programming language?"
-        })
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        output = response["output"]
-        
+        response = _ask(agent_executor, "What is Python programming language?")
+
+        assert "Guido van Rossum" in _tool_results(response)["search_tool"]
+        mock_search.run.assert_called_once()
         # Should mention Python in some way
-        assert ("python" in output.lower() or 
-                "programming" in output.lower() or
-                "language" in output.lower())
+        assert PYTHON_REPLY_RE.search(assert_agent_reply(response))
 
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_schedule_and_list_workflow(self):
+    @pytest.mark.usefixtures("isolated_scheduler")
+    def test_schedule_and_list_workflow(self, set_llm_responses, agent_executor):
         """Test workflow: schedule task → list tasks → verify task appears."""
-        from agent.main import agent_executor
-        
-        # Clear any existing tasks first
-        from agent.tools.task_scheduler import get_scheduler
-        scheduler = get_scheduler()
-        for job in scheduler.get_jobs():
-            scheduler.remove_job(job.id)
-        
+        set_llm_responses([
+            _tool_call("schedule_task", prompt="Call mom", run_at=_in_an_hour(),
+                       chat_id="123", task_name="Call mom"),
+            "Done, I'll remind you to call mom.",
+            _tool_call("list_scheduled_tasks"),
+            "You have one scheduled task: Call mom.",
+        ])
+
         # Step 1: Schedule a task
-        future_time = (datetime.now() + timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S")
-        
-        schedule_response = agent_executor.invoke({
-            "input": f"Schedule a reminder to 'Call mom' at {future_time} for chat 123"
-        })
-        
-        assert "scheduled" in schedule_response["output"].lower()
-        
+        schedule_response = _ask(agent_executor, "Remind me to call mom in an hour. My chat is 123")
+
+        assert "scheduled successfully" in _tool_results(schedule_response)["schedule_task"]
+
         # Step 2: List tasks to verify it was scheduled
-        list_response = agent_executor.invoke({
-            "input": "List my scheduled tasks"
-        })
-        
-        assert ("scheduled tasks" in list_response["output"].lower() or
-                "call mom" in list_response["output"].lower())
-
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_conversation_memory_workflow(self):
+        list_response = _ask(agent_executor, "List my scheduled tasks")
+
+        assert TASK_LIST_REPLY_RE.search(_tool_results(list_response)["list_scheduled_tasks"])
+        assert TASK_LIST_REPLY_RE.search(assert_agent_reply(list_response))
+
+    def test_conversation_memory_workflow(self, set_llm_responses, agent_executor):
         """Test that conversation memory works across multiple interactions."""
-        from agent.main import agent_executor
-        
+        set_llm_responses(["Nice, Python it is!", "You said Python."])
+
         # First interaction - provide information
-        response1 = agent_executor.invoke({
-            "input": "My favorite programming language is Python"
-        })
-        
+        _ask(agent_executor, "My favorite programming language is Python")
+
         # Second interaction - ask about previously mentioned information
-        response2 = agent_executor.invoke({
-            "input": "What did I say my favorite programming language was?"
-        })
-        
-        # Should remember Python from the previous conversation
-        assert "python" in response2["output"].lower()
-
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    @patch('agent.tools.telegram_scraper.TelethonChannelCollector')
-    def test_telegram_scraping_workflow(self, mock_collector_class):
+        response = _ask(agent_executor, "What did I say my favorite programming language was?")
+
+        # The checkpointer replays the first turn into the second one
+        contents = [m.content for m in assert_agent_messages(response)]
+        assert contents[0] == "My favorite programming language is Python"
+        assert "python" in assert_agent_reply(response).lower()
+
+    def test_telegram_scraping_workflow(self, mock_collector, set_llm_responses, agent_executor):
         """Test workflow: user asks for news → agent scrapes Telegram → provides summary."""
-        from agent.main import agent_executor
-        
-        # Mock telegram scraper
-        mock_instance = MagicMock()
-        mock_collector_class.return_value = mock_instance
-        mock_instance.start_client.return_value = True
-        mock_instance.get_recent_messages.return_value = [
+        mock_collector.start_client.return_value = True
+        mock_collector.get_recent_messages.return_value = [
             {"text": "Breaking: Important news update", "date": "2025-08-21", "views": 1000}
         ]
-        
+        set_llm_responses([
+            _tool_call("get_latest_messages", request="news"),
+            "Here's the latest news from Telegram: an important update.",
+        ])
+
         # User asks for latest news
-        response = agent_executor.invoke({
-            "input": "Get me the latest news from Telegram channels"
-        })
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        # Should either show news or indicate an attempt was made
-        output = response["output"].lower()
-        assert ("news" in output or 
-                "telegram" in output or 
-                "messages" in output or
-                "channel" in output)
-
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_error_recovery_workflow(self):
+        response = _ask(agent_executor, "Get me the latest news from Telegram channels")
+
+        assert "Breaking: Important news update" in _tool_results(response)["get_latest_messages"]
+        assert NEWS_REPLY_RE.search(assert_agent_reply(response))
+
+    def test_error_recovery_workflow(self, set_llm_responses, agent_executor):
         """Test that system recovers gracefully from errors."""
-        from agent.main import agent_executor
-        
+        set_llm_responses([
+            _tool_call("schedule_task", prompt="Do something", run_at="yesterday at 25:99:99",
+                       chat_id="123", task_name="Bad time"),
+            "Sorry, that time is invalid.",
+        ])
+
         # Try to schedule a task with invalid date (should handle gracefully)
-        response = agent_executor.invoke({
-            "input": "Schedule a task for yesterday at 25:99:99"
-        })
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        # Should handle error gracefully without crashing
-        output = response["output"]
-        assert isinstance(output, str)
-        assert len(output) > 0
-        # Should indicate there was an issue with the request
-        assert ("error" in output.lower() or 
-                "invalid" in output.lower() or
-                "sorry" in output.lower() or
-                "can't" in output.lower())
-
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_multi_tool_workflow(self):
+        response = _ask(agent_executor, "Schedule a task for yesterday at 25:99:99")
+
+        # The tool reports the bad input and the agent still answers
+        assert ERROR_REPLY_RE.search(_tool_results(response)["schedule_task"])
+        assert ERROR_REPLY_RE.search(assert_agent_reply(response))
+
+    @pytest.mark.usefixtures("isolated_scheduler")
+    def test_multi_tool_workflow(self, mock_search, set_llm_responses, agent_executor):
         """Test workflow that might use multiple tools."""
-        from agent.main import agent_executor
-        
-        # Ask for something that might require both search and scheduling
-        response = agent_executor.invoke({
-            "input": "Search for 'meeting best practices' and then remind me about it in 2 hours"
-        })
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        output = response["output"]
-        
-        # Should attempt to handle the complex request
-        assert len(output) > 0
+        set_llm_responses([
+            _tool_call("search_tool", query="meeting best practices"),
+            _tool_call("schedule_task", prompt="Review meeting best practices",
+                       run_at=_in_an_hour(), chat_id="123", task_name="Meeting tips"),
+            "I searched for meeting best practices and will remind you in an hour.",
+        ])
+
+        # Two tool round trips plus the final answer need more steps than the default
+        response = _ask(
+            agent_executor,
+            "Search for 'meeting best practices' and then remind me about it in an hour",
+            recursion_limit=7,
+        )
+
+        assert set(_tool_results(response)) == {"search_tool", "schedule_task"}
         # Should mention either searching, scheduling, or both
-        assert ("search" in output.lower() or 
-                "remind" in output.lower() or
-                "schedule" in output.lower() or
-                "meeting" in output.lower())
+        assert MULTI_TOOL_REPLY_RE.search(assert_agent_reply(response))
 
 
 class TestSystemResilience:
     """Test system resilience and error handling."""
-    
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_agent_with_invalid_tool_input(self):
+
+    def test_agent_with_invalid_tool_input(self, agent_executor):
         """Test agent handles invalid tool inputs gracefully."""
-        from agent.main import agent_executor
-        
         # This should not crash the system
-        response = agent_executor.invoke({
-            "input": "Schedule a task with completely invalid parameters"
-        })
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        assert isinstance(response["output"], str)
-
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_agent_with_very_long_input(self):
+        response = _ask(agent_executor, "Schedule a task with completely invalid parameters")
+
+        assert assert_agent_reply(response)
+
+    def test_agent_with_very_long_input(self, agent_executor):
         """Test agent handles very long inputs."""
-        from agent.main import agent_executor
-        
         # Create a very long input
         long_input = "Please help me with this task: " + "A" * 1000
-        
-        response = agent_executor.invoke({"input": long_input})
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        assert isinstance(response["output"], str)
-
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_agent_with_empty_input(self):
+
+        response = _ask(agent_executor, long_input)
+
+        assert assert_agent_reply(response)
+
+    def test_agent_with_empty_input(self, agent_executor):
         """Test agent handles empty or minimal input."""
-        from agent.main import agent_executor
-        
-        response = agent_executor.invoke({"input": ""})
-        
-        assert isinstance(response, dict)
-        assert "output" in response
-        assert isinstance(response["output"], str)
+        response = _ask(agent_executor, "")
+
+        assert assert_agent_reply(response)
@@ -1,29 +1,35 @@
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
-import os
+import importlib.util
 
-# Skip entire module if no API key — these tests import agent.main which triggers LLM init
-pytestmark = pytest.mark.skipif(
-    not os.getenv("GOOGLE_API_KEY"),
-    reason="GOOGLE_API_KEY not set — integration tests require Gemini credentials",
+from tests._assertions import assert_agent_messages, assert_agent_reply
+
+# register_tools('all') includes the specialized agents, which import the Todoist client
+requires_todoist = pytest.mark.skipif(
+    importlib.util.find_spec("todoist_api_python") is None,
+    reason="todoist-api-python not installed — the 'all' tool set needs it",
 )
 
-from agent.main import agent_executor, agent
-from agent.tools.tool_registry import register_tools
+
+@pytest.fixture(autouse=True)
+def _telegram_token(monkeypatch):
+    """Run every test in this module with a dummy Telegram bot token."""
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test_token")
 
 
 class TestMainAgent:
     """Test the main agent functionality."""
     
-    def test_agent_executor_initialization(self):
+    def test_agent_executor_initialization(self, agent_executor):
         """Test that the agent executor is properly initialized."""
         assert agent_executor is not None
         # In a LangGraph agent, tools are often accessible via the 'agent' node or tools property depending on version
         assert hasattr(agent_executor, 'name') or hasattr(agent_executor, 'builder') or hasattr(agent_executor, 'nodes')
         assert hasattr(agent_executor, 'checkpointer')
 
+    @requires_todoist
     def test_agent_tools_loaded(self):
         """Test that all expected tools are loaded."""
+        from agent.tools.tool_registry import register_tools
         tools = register_tools('all')
         tool_names = [tool.name for tool in tools]
         
@@ -39,20 +45,41 @@ class TestMainAgent:
         for expected_tool in expected_tools:
             assert expected_tool in tool_names
 
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_agent_simple_query(self):
+    def test_agent_and_tools_smoke(self, agent_executor):
+        """Smoke-test an agent round trip and the tool registry side by side."""
+        from langchain_core.messages import HumanMessage
+        from langchain_core.runnables import RunnableLambda, RunnableParallel
+        from agent.tools.tool_registry import register_tools, _tool_name
+        
+        # The branches share no state, so RunnableParallel overlaps the LLM
+        # call with building the tool registry
+        smoke = RunnableParallel(
+            agent=RunnableLambda(lambda _: agent_executor.invoke(
+                {"messages": [HumanMessage(content="Hello, what are you capable of?")]},
+                config={"configurable": {"thread_id": "test_smoke"}},
+            )),
+            tools=RunnableLambda(lambda _: register_tools('scheduler')),
+        )
+        results = smoke.invoke(None)
+        
+        assert assert_agent_reply(results["agent"])
+        # The scheduler group holds the plain registered functions, not Tool objects
+        assert 'schedule_task' in [_tool_name(tool) for tool in results["tools"]]
+
+    def test_agent_simple_query(self, agent_executor):
         """Test agent with a simple query."""
         from langchain_core.messages import HumanMessage
-        response = agent_executor.invoke({
+        # Stream graph states so each step can be checked, not just the final one
+        states = list(agent_executor.stream({
             "messages": [HumanMessage(content="Hello, what are you capable of?")]
-        }, config={"configurable": {"thread_id": "test_simple"}})
+        }, config={"configurable": {"thread_id": "test_simple"}}, stream_mode="values"))
         
-        assert isinstance(response, dict)
-        assert "messages" in response
-        assert len(response["messages"]) > 0
+        # The input state comes first and the agent's reply is streamed after it
+        assert states[0]["messages"][-1].content == "Hello, what are you capable of?"
+        assert len(states) > 1
+        assert assert_agent_reply(states[-1])
 
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_agent_memory_functionality(self):
+    def test_agent_memory_functionality(self, agent_executor):
         """Test that conversation memory works."""
         from langchain_core.messages import HumanMessage
         
@@ -72,11 +99,13 @@ class TestMainAgent:
         assert "TestUser" in final_message or "test" in final_message.lower()
 
 
+@requires_todoist
 class TestToolRegistry:
     """Test tool registry functionality."""
     
     def test_register_all_tools(self):
         """Test registering all tools."""
+        from agent.tools.tool_registry import register_tools
         tools = register_tools('all')
         # 1 telegram + 3 scheduler + 2 search + 2 agents + 14 database = 22
         assert len(tools) == 22
@@ -92,13 +121,15 @@ class TestToolRegistry:
 
     def test_register_telegram_tools(self):
         """Test registering only telegram tools."""
-        tools = register_tools('telegram')
+        from agent.tools.tool_registry import register_tools, tool_categories
+        tools = [t for t in register_tools('all') if 'telegram' in tool_categories(t)]
         assert len(tools) == 1
         assert tools[0].name == 'get_latest_messages'
 
     def test_register_scheduler_tools(self):
         """Test registering only scheduler tools."""
-        tools = register_tools('scheduler')
+        from agent.tools.tool_registry import register_tools, tool_categories
+        tools = [t for t in register_tools('all') if 'scheduler' in tool_categories(t)]
         assert len(tools) == 3
         
         tool_names = [tool.name for tool in tools]
@@ -109,36 +140,36 @@ class TestToolRegistry:
 
     def test_register_invalid_category(self):
         """Test registering with invalid category falls back to 'all' tools."""
+        from agent.tools.tool_registry import register_tools
         tools = register_tools('invalid_category')
-        # Fallback is the same as 'all' = 22 tools
+        # Fallback is the same (cached) 'all' list of 22 tools
         all_tools = register_tools('all')
-        assert len(tools) == len(all_tools)
+        assert tools == all_tools
 
 
 class TestAgentIntegration:
     """Integration tests for the complete agent system."""
     
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    @patch('agent.tools.extra_tools.DuckDuckGoSearchRun')
-    def test_agent_with_search_tool(self, mock_search):
+    def test_agent_with_search_tool(self, mock_search, set_llm_responses, agent_executor):
         """Test agent using search tool."""
-        from langchain_core.messages import HumanMessage
-        # Mock the search tool
-        mock_search_instance = MagicMock()
-        mock_search.return_value = mock_search_instance
-        mock_search_instance.run.return_value = "Search results about Python"
+        from langchain_core.messages import AIMessage, HumanMessage
+        set_llm_responses([
+            AIMessage(content="", tool_calls=[{
+                "name": "search_tool", "args": {"query": "Python programming"}, "id": "call_search",
+            }]),
+            "Python is a popular programming language.",
+        ])
         
         response = agent_executor.invoke({
             "messages": [HumanMessage(content="Search for information about Python programming")]
         }, config={"configurable": {"thread_id": "test_search"}})
         
-        assert isinstance(response, dict)
-        assert "messages" in response
-        # Should contain either search results or indication that search was attempted
-        assert len(response["messages"]) > 0
+        # The search result reaches the agent before it answers
+        tool_messages = [m for m in assert_agent_messages(response) if m.type == "tool"]
+        assert [m.content for m in tool_messages] == ["Search results about Python"]
+        assert "Python" in assert_agent_reply(response)
 
-    @patch.dict(os.environ, {'TELEGRAM_BOT_TOKEN': 'test_token'})
-    def test_agent_error_handling(self):
+    def test_agent_error_handling(self, agent_executor):
         """Test agent handles errors gracefully."""
         from langchain_core.messages import HumanMessage
         # Test with malformed input that might cause issues
@@ -146,7 +177,5 @@ class TestAgentIntegration:
             "messages": [HumanMessage(content="Schedule a task for yesterday")]  # Invalid request
         }, config={"configurable": {"thread_id": "test_error"}})
         
-        assert isinstance(response, dict)
-        assert "messages" in response
         # Should handle error gracefully without crashing
-        assert len(response["messages"]) > 0
+        assert_agent_messages(response)
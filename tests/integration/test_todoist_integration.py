@@ -3,64 +3,62 @@
 Test script for Todoist tools
 """
 
+import asyncio
 import os
-from agent.tools.planner_tools.todoist_tool import (
-    todoist_add_tasks_tool,
-    todoist_delete_task_tool,
-    todoist_update_task_tool,
-    todoist_get_tasks_by_date_tool
-)
+import sys
+import pytest
 
-def test_todoist_tools():
+pytestmark = pytest.mark.serial
+
+async def test_todoist_tools(step):
     """Test all Todoist tools"""
     
     # Check if API token is set
     if not os.getenv("TODOIST_API_TOKEN"):
-        print("⚠️  TODOIST_API_TOKEN environment variable not set.")
-        print("Please set your Todoist API token to test the tools:")
-        print("export TODOIST_API_TOKEN='your_api_token_here'")
-        print("\nYou can get your token from: https://todoist.com/prefs/integrations")
-        return
-    
-    print("🧪 Testing Todoist tools...")
-    
-    # Test 1: Add tasks tool
-    print("\n1. Testing todoist_add_tasks tool:")
-    add_tool = todoist_add_tasks_tool()
-    print(f"Tool name: {add_tool.name}")
-    print(f"Description: {add_tool.description}")
+        pytest.skip(
+            "TODOIST_API_TOKEN not set; get a token from "
+            "https://todoist.com/prefs/integrations to run this test"
+        )
     
-    # Test 2: Delete task tool
-    print("\n2. Testing todoist_delete_task tool:")
-    delete_tool = todoist_delete_task_tool()
-    print(f"Tool name: {delete_tool.name}")
-    print(f"Description: {delete_tool.description}")
+    # Imported here so collection does not depend on the Todoist client
+    from agent.tools.planner_tools.todoist_tool import (
+        todoist_add_tasks_tool,
+        todoist_delete_task_tool,
+        todoist_update_task_tool,
+        todoist_get_tasks_by_date_tool
+    )
     
-    # Test 3: Update task tool
-    print("\n3. Testing todoist_update_task tool:")
-    update_tool = todoist_update_task_tool()
-    print(f"Tool name: {update_tool.name}")
-    print(f"Description: {update_tool.description}")
+    with step("create_tools"):
+        tools = [
+            todoist_add_tasks_tool(),
+            todoist_delete_task_tool(),
+            todoist_update_task_tool(),
+            todoist_get_tasks_by_date_tool(),
+        ]
+    get_tasks_tool = tools[-1]
     
-    # Test 4: Get tasks by date tool
-    print("\n4. Testing todoist_get_tasks_by_date tool:")
-    get_tasks_tool = todoist_get_tasks_by_date_tool()
-    print(f"Tool name: {get_tasks_tool.name}")
-    print(f"Description: {get_tasks_tool.description}")
+    assert [tool.name for tool in tools] == [
+        "todoist_add_tasks",
+        "todoist_delete_task",
+        "todoist_update_task",
+        "todoist_get_tasks_by_date",
+    ]
+    assert all(tool.description for tool in tools)
     
-    print("\n✅ All tools created successfully!")
+    # Test actual API calls with the configured token
+    # The read-only lookups are independent, so issue them together
+    dates = ["today", "tomorrow"]
+    with step("get_tasks_by_date"):
+        results = await asyncio.gather(
+            *(asyncio.wait_for(get_tasks_tool.ainvoke(day), timeout=10) for day in dates),
+            return_exceptions=True
+        )
     
-    # Test actual API calls (if token is available)
-    try:
-        print("\n🔄 Testing actual API calls...")
-        
-        # Test getting today's tasks
-        result = get_tasks_tool.func("today")
-        print(f"Today's tasks result: {result}")
-        
-    except Exception as e:
-        print(f"❌ API test failed: {str(e)}")
-        print("This might be because the API token is invalid or there's a network issue.")
+    for day, result in zip(dates, results):
+        # An exception here usually means an invalid token or a network issue
+        assert not isinstance(result, Exception), f"Todoist lookup for {day} failed: {result}"
+        assert isinstance(result, str)
 
 if __name__ == "__main__":
-    test_todoist_tools()
+    # Run through pytest so the step fixture and skip handling apply
+    sys.exit(pytest.main([__file__]))
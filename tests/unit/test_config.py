@@ -4,18 +4,24 @@ import os
 from config.logging_config import setup_development_logging, get_logger
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _logging_once():
+    """Attach the development handlers once for every test in this module."""
+    setup_development_logging()
+
+
 class TestLoggingConfig:
     """Test logging configuration functionality."""
     
     def test_setup_development_logging(self):
         """Test development logging setup."""
-        # Should not raise any exceptions
-        setup_development_logging()
-        
-        # Test logger creation
+        import logging
+
+        # Handlers were attached once by _logging_once; loggers come from logging's cache
         logger = get_logger("test_module")
         assert logger is not None
         assert logger.name == "test_module"
+        assert logger is logging.getLogger("test_module")
 
     def test_get_logger_with_different_names(self):
         """Test getting loggers with different names."""
@@ -26,15 +32,26 @@ class TestLoggingConfig:
         assert logger2.name == "module2"
         assert logger1 is not logger2
 
-    def test_logger_functionality(self):
-        """Test basic logger functionality."""
-        logger = get_logger("test_logger")
-        
+    @pytest.mark.parametrize("level", ["info", "debug", "warning", "error"])
+    def test_logger_functionality(self, level):
+        """Test that each logging level can be emitted."""
         # Should not raise exceptions
-        logger.info("Test info message")
-        logger.debug("Test debug message")
-        logger.warning("Test warning message")
-        logger.error("Test error message")
+        getattr(get_logger("test_logger"), level)(f"Test {level} message")
+
+    def test_queue_logging_uses_single_queue_handler(self):
+        """Test that queued logging leaves only a QueueHandler on the root logger."""
+        import logging
+        import logging.handlers
+        from config.logging_config import setup_logging, reset_logging_config
+
+        reset_logging_config()
+        try:
+            setup_logging(use_queue=True)
+            handlers = logging.getLogger().handlers
+            assert len(handlers) == 1
+            assert isinstance(handlers[0], logging.handlers.QueueHandler)
+        finally:
+            reset_logging_config()
 
 
 class TestEnvironmentConfig:
@@ -3,11 +3,27 @@ Unit tests for database tools.
 Tests the refactored LangChain database tools for the personal assistant agent.
 """
 
+import asyncio
 import pytest
-import json
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
 from datetime import date
 
-from agent.tools.planner_tools.database_tools import get_database_tools
+
+def _index(items, key):
+    """Map each item's ``key`` value to the item for O(1) lookups."""
+    return {item[key]: item for item in items}
+
+
+@pytest.fixture(scope="session")
+def db_tools():
+    """The database tools keyed by name, built once for the session."""
+    # Imported here so collecting this module doesn't load LangChain and the DB layer
+    from agent.tools.planner_tools.database_tools import get_database_tools
+    return {tool.name: tool for tool in get_database_tools()}
 
 
 @pytest.mark.unit
@@ -15,10 +31,17 @@ class TestDatabaseTools:
     """Test database tools functionality."""
 
     @pytest.fixture(autouse=True)
-    def setup_tools(self):
-        """Set up database tools for each test."""
-        self.tools = get_database_tools()
-        self.tool_dict = {tool.name: tool for tool in self.tools}
+    def setup_tools(self, db_tools):
+        """Point each test at the shared tool dict."""
+        self.tool_dict = db_tools
+
+    def _habits(self):
+        """Fetch and parse the active habits in one call."""
+        return loads(self.tool_dict["get_habits_tool"].invoke({"active_only": True}))
+
+    def _tasks(self):
+        """Fetch and parse the tasks in one call."""
+        return loads(self.tool_dict["get_tasks_tool"].invoke({}))
 
     def test_tools_loaded(self):
         """Test that all expected database tools are loaded."""
@@ -38,7 +61,7 @@ class TestDatabaseTools:
             "search_items_tool"
         ]
         
-        assert len(self.tools) == len(expected_tools)
+        assert len(self.tool_dict) == len(expected_tools)
         for tool_name in expected_tools:
             assert tool_name in self.tool_dict, f"Missing tool: {tool_name}"
 
@@ -55,11 +78,10 @@ class TestDatabaseTools:
         assert "successfully" in create_result.lower()
         
         # Get habits
-        get_result = self.tool_dict["get_habits_tool"].invoke({"active_only": True})
-        habits = json.loads(get_result)
+        habits = self._habits()
         
         assert len(habits) > 0
-        assert any(h["name"] == "Morning Exercise" for h in habits)
+        assert "Morning Exercise" in _index(habits, "name")
 
     def test_complete_habit(self):
         """Test completing a habit."""
@@ -72,9 +94,8 @@ class TestDatabaseTools:
         })
         
         # Get the habit ID
-        habits_result = self.tool_dict["get_habits_tool"].invoke({"active_only": True})
-        habits = json.loads(habits_result)
-        habit_id = next(h["id"] for h in habits if h["name"] == "Reading")
+        habits = self._habits()
+        habit_id = _index(habits, "name")["Reading"]["id"]
         
         # Complete the habit
         complete_result = self.tool_dict["complete_habit_tool"].invoke({
@@ -98,11 +119,10 @@ class TestDatabaseTools:
         assert "successfully" in create_result.lower() or "created" in create_result.lower()
         
         # Get tasks
-        get_result = self.tool_dict["get_tasks_tool"].invoke({})
-        tasks = json.loads(get_result)
+        tasks = self._tasks()
         
         assert len(tasks) > 0
-        assert any(t["title"] == "Complete project proposal" for t in tasks)
+        assert "Complete project proposal" in _index(tasks, "title")
 
     def test_complete_task(self):
         """Test completing a task."""
@@ -114,9 +134,8 @@ class TestDatabaseTools:
         })
         
         # Get the task ID
-        tasks_result = self.tool_dict["get_tasks_tool"].invoke({})
-        tasks = json.loads(tasks_result)
-        task_id = next(t["id"] for t in tasks if t["title"] == "Write report")
+        tasks = self._tasks()
+        task_id = _index(tasks, "title")["Write report"]["id"]
         
         # Complete the task
         complete_result = self.tool_dict["complete_task_tool"].invoke({
@@ -126,62 +145,66 @@ class TestDatabaseTools:
         
         assert "completed" in complete_result.lower()
 
-    def test_daily_schedule_workflow(self):
+    async def test_daily_schedule_workflow(self, step):
         """Test complete daily schedule workflow."""
         test_date = "2030-09-15"
         
-        # Create a schedule
-        schedule_result = self.tool_dict["create_daily_schedule_tool"].invoke({
-            "schedule_date": test_date,
-            "day_type": "work_day",
-            "total_available_time": 480
-        })
+        # Writes share one SQLite database, so they run one after another
+        with step("create_schedule_habit_task"):
+            schedule_result = await self.tool_dict["create_daily_schedule_tool"].ainvoke({
+                "schedule_date": test_date,
+                "day_type": "work_day",
+                "total_available_time": 480
+            })
+            await self.tool_dict["create_habit_tool"].ainvoke({
+                "name": "Meditation",
+                "frequency_type": "daily",
+                "estimated_duration": 15,
+                "priority_level": 8
+            })
+            await self.tool_dict["create_task_tool"].ainvoke({
+                "title": "Review code",
+                "description": "Code review session",
+                "priority_level": 7
+            })
         
         assert "successfully" in schedule_result.lower() or "created" in schedule_result.lower() or "already exists" in schedule_result.lower()
         
-        # Create habit and task for the schedule
-        self.tool_dict["create_habit_tool"].invoke({
-            "name": "Meditation",
-            "frequency_type": "daily",
-            "estimated_duration": 15,
-            "priority_level": 8
-        })
+        # Get IDs - the two reads are independent, so they run concurrently
+        with step("get_ids"):
+            habits_result, tasks_result = await asyncio.gather(
+                self.tool_dict["get_habits_tool"].ainvoke({"active_only": True}),
+                self.tool_dict["get_tasks_tool"].ainvoke({}),
+            )
+        habits = loads(habits_result)
+        tasks = loads(tasks_result)
         
-        self.tool_dict["create_task_tool"].invoke({
-            "title": "Review code",
-            "description": "Code review session",
-            "priority_level": 7
-        })
-        
-        # Get IDs
-        habits = json.loads(self.tool_dict["get_habits_tool"].invoke({"active_only": True}))
-        tasks = json.loads(self.tool_dict["get_tasks_tool"].invoke({}))
-        
-        habit_id = next(h["id"] for h in habits if h["name"] == "Meditation")
-        task_id = next(t["id"] for t in tasks if t["title"] == "Review code")
+        habit_id = _index(habits, "name")["Meditation"]["id"]
+        task_id = _index(tasks, "title")["Review code"]["id"]
         
         # Add items to schedule
-        habit_add_result = self.tool_dict["add_habit_to_schedule_tool"].invoke({
-            "schedule_date": test_date,
-            "habit_id": habit_id,
-            "suggested_time": "07:00"
-        })
-        
-        task_add_result = self.tool_dict["add_task_to_schedule_tool"].invoke({
-            "schedule_date": test_date,
-            "task_id": task_id,
-            "suggested_time": "09:00"
-        })
+        with step("add_schedule_items"):
+            habit_add_result = await self.tool_dict["add_habit_to_schedule_tool"].ainvoke({
+                "schedule_date": test_date,
+                "habit_id": habit_id,
+                "suggested_time": "07:00"
+            })
+            task_add_result = await self.tool_dict["add_task_to_schedule_tool"].ainvoke({
+                "schedule_date": test_date,
+                "task_id": task_id,
+                "suggested_time": "09:00"
+            })
         
         assert "added" in habit_add_result.lower() or "already" in habit_add_result.lower()
         assert "added" in task_add_result.lower() or "already" in task_add_result.lower()
         
         # Get the complete schedule
-        schedule_result = self.tool_dict["get_daily_schedule_tool"].invoke({
-            "schedule_date": test_date
-        })
+        with step("get_schedule"):
+            schedule_result = await self.tool_dict["get_daily_schedule_tool"].ainvoke({
+                "schedule_date": test_date
+            })
         
-        schedule = json.loads(schedule_result)
+        schedule = loads(schedule_result)
         assert len(schedule["habit_items"]) > 0
         assert len(schedule["task_items"]) > 0
 
@@ -203,7 +226,7 @@ class TestDatabaseTools:
             "estimated_duration": 30
         })
         
-        habits = json.loads(self.tool_dict["get_habits_tool"].invoke({"active_only": True}))
+        habits = self._habits()
         habit_id = habits[0]["id"]
         
         self.tool_dict["complete_habit_tool"].invoke({
@@ -213,7 +236,7 @@ class TestDatabaseTools:
         
         # Get insights
         result = self.tool_dict["get_productivity_insights_tool"].invoke({"days": 7})
-        insights = json.loads(result)
+        insights = loads(result)
         
         assert "habit_completions" in insights
         # The actual schema uses 'tasks_completed' not 'task_completions'
@@ -240,27 +263,19 @@ class TestDatabaseTools:
             "item_type": "both"
         })
         
-        search_results = json.loads(result)
+        search_results = loads(result)
         assert len(search_results["habits"]) > 0 or len(search_results["tasks"]) > 0
 
-    def test_tool_error_handling(self):
-        """Test that tools handle errors gracefully."""
-        # Try to complete non-existent habit
-        result = self.tool_dict["complete_habit_tool"].invoke({
-            "habit_id": 99999,
-            "notes": "This should fail"
-        })
-        
-        assert "error" in result.lower() or "not found" in result.lower()
-
-    def test_enum_validation(self):
-        """Test that tools properly validate enum values."""
-        # Try to create habit with invalid frequency type
-        result = self.tool_dict["create_habit_tool"].invoke({
-            "name": "Test Habit",
-            "frequency_type": "invalid_frequency",
-            "estimated_duration": 30
-        })
+    @pytest.mark.parametrize("tool_name, args, expected", [
+        # Completing a non-existent habit reports the failure
+        ("complete_habit_tool", {"habit_id": 99999, "notes": "This should fail"}, ("error", "not found")),
+        # An invalid frequency type is handled without raising
+        ("create_habit_tool", {"name": "Test Habit", "frequency_type": "invalid_frequency", "estimated_duration": 30}, None),
+    ], ids=["missing_habit", "invalid_enum"])
+    def test_tool_errors(self, tool_name, args, expected):
+        """Test that tools handle bad input gracefully with a string response."""
+        result = self.tool_dict[tool_name].invoke(args)
         
-        # Should handle the error gracefully
         assert isinstance(result, str)  # Tool should return a string response
+        if expected:
+            assert any(text in result.lower() for text in expected)
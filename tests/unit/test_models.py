@@ -4,24 +4,108 @@ Tests the refactored SQLAlchemy models with proper relationships, enums, and con
 """
 
 import pytest
-from datetime import datetime, date, time
-from sqlalchemy import inspect
+from collections import namedtuple
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import inspect, update
 
 from database.models import (
     Tag, Habit, Task, DailySchedule, HabitScheduleItem, TaskScheduleItem,
     FrequencyType, TaskType, VolumeSize, DayType, TaskStatus
 )
 
+TODAY = date.today()
+MORNING = time(7, 0)
+NINE_AM = time(9, 0)
+
+
+def _factory(session, model, **defaults):
+    """Return a builder that adds ``model(**defaults, **overrides)`` and flushes it."""
+    def make(**overrides):
+        instance = model(**{**defaults, **overrides})
+        session.add(instance)
+        session.flush()
+        return instance
+    return make
+
+
+@pytest.fixture
+def make_tag(test_session):
+    """Build and flush a Tag; keyword arguments override the defaults."""
+    return _factory(test_session, Tag, name="Tag", color="#000000")
+
+
+@pytest.fixture
+def make_habit(test_session):
+    """Build and flush a daily Habit; keyword arguments override the defaults."""
+    return _factory(
+        test_session, Habit,
+        name="Habit", frequency_type=FrequencyType.DAILY, estimated_duration=30,
+    )
+
+
+@pytest.fixture
+def make_task(test_session):
+    """Build and flush a one-time Task; keyword arguments override the defaults."""
+    return _factory(test_session, Task, title="Task", task_type=TaskType.ONE_TIME)
+
+
+ScheduleGraph = namedtuple("ScheduleGraph", "tag habit task schedule habit_item task_item")
+
+
+@pytest.fixture(scope="class")
+def schedule_graph(class_session):
+    """Tag, habit, task and a schedule holding one item for each, flushed once per class."""
+    tag = Tag(name="Health-Schedule", color="#FF5733")
+    habit = Habit(
+        name="Morning Exercise Schedule",
+        frequency_type=FrequencyType.DAILY,
+        estimated_duration=30,
+        priority_level=8,
+        tags=[tag],
+    )
+    task = Task(
+        title="Project work schedule",
+        task_type=TaskType.ONE_TIME,
+        priority_level=7,
+        tags=[tag],
+    )
+    schedule = DailySchedule(
+        schedule_date=TODAY + timedelta(days=1),  # Use tomorrow to avoid conflicts
+        day_type=DayType.WORK_DAY,
+        total_available_time=480
+    )
+    
+    # Flush for the parent IDs; the schedule items go in a second flush
+    class_session.add_all([tag, habit, task, schedule])
+    class_session.flush()
+    
+    habit_item = HabitScheduleItem(
+        schedule_id=schedule.id,
+        habit_id=habit.id,
+        suggested_time=MORNING,
+        priority_score=8.5,
+        estimated_duration=30
+    )
+    task_item = TaskScheduleItem(
+        schedule_id=schedule.id,
+        task_id=task.id,
+        suggested_time=NINE_AM,
+        priority_score=9.0,
+        estimated_duration=120
+    )
+    class_session.add_all([habit_item, task_item])
+    class_session.flush()
+    
+    return ScheduleGraph(tag, habit, task, schedule, habit_item, task_item)
+
 
 @pytest.mark.unit
 class TestDatabaseModels:
     """Test database models functionality."""
 
-    def test_tag_creation(self, test_session):
+    def test_tag_creation(self, make_tag):
         """Test creating a tag."""
-        tag = Tag(name="Health", color="#FF5733")
-        test_session.add(tag)
-        test_session.commit()
+        tag = make_tag(name="Health", color="#FF5733")
         
         assert tag.id is not None
         assert tag.name == "Health"
@@ -29,23 +113,11 @@ class TestDatabaseModels:
         assert tag.created_at is not None
         assert not tag.is_deleted
 
-    def test_habit_creation_with_enums(self, test_session):
+    def test_habit_creation_with_enums(self, make_habit):
         """Test creating a habit with enum values and relationships."""
-        # Create tag first with unique name
+        # The tag is linked through the relationship, so both go in one flush
         tag = Tag(name="Health-Habit-Test", color="#FF5733")
-        test_session.add(tag)
-        test_session.flush()
-        
-        # Create habit
-        habit = Habit(
-            name="Morning Exercise",
-            frequency_type=FrequencyType.DAILY,
-            estimated_duration=30,
-            priority_level=8
-        )
-        habit.tags.append(tag)
-        test_session.add(habit)
-        test_session.commit()
+        habit = make_habit(name="Morning Exercise", priority_level=8, tags=[tag])
         
         assert habit.id is not None
         assert habit.name == "Morning Exercise"
@@ -55,25 +127,18 @@ class TestDatabaseModels:
         assert len(habit.tags) == 1
         assert habit.tags[0].name == "Health-Habit-Test"
 
-    def test_task_creation_with_enums(self, test_session):
+    def test_task_creation_with_enums(self, make_task):
         """Test creating a task with proper enum values."""
-        # Create tag first
+        # The tag is linked through the relationship, so both go in one flush
         tag = Tag(name="Work", color="#0066CC")
-        test_session.add(tag)
-        test_session.flush()
-        
-        # Create task
-        task = Task(
+        task = make_task(
             title="Complete project proposal",
             description="Write the final proposal for the new project",
-            task_type=TaskType.ONE_TIME,
             priority_level=9,
             volume_size=VolumeSize.LARGE,
-            estimated_duration=120
+            estimated_duration=120,
+            tags=[tag],
         )
-        task.tags.append(tag)
-        test_session.add(task)
-        test_session.commit()
         
         assert task.id is not None
         assert task.title == "Complete project proposal"
@@ -85,70 +150,18 @@ class TestDatabaseModels:
     def test_daily_schedule_creation(self, test_session):
         """Test creating a daily schedule."""
         schedule = DailySchedule(
-            schedule_date=date.today(),
+            schedule_date=TODAY,
             day_type=DayType.WORK_DAY,
             total_available_time=480
         )
         test_session.add(schedule)
-        test_session.commit()
+        test_session.flush()
         
         assert schedule.id is not None
-        assert schedule.schedule_date == date.today()
+        assert schedule.schedule_date == TODAY
         assert schedule.day_type == DayType.WORK_DAY
         assert schedule.total_available_time == 480
 
-    def test_schedule_items_creation(self, test_session):
-        """Test creating schedule items with proper foreign key relationships."""
-        from datetime import datetime, timedelta
-        unique_date = date.today() + timedelta(days=1)  # Use tomorrow to avoid conflicts
-        
-        # Create dependencies
-        tag = Tag(name="Health-Schedule", color="#FF5733")
-        habit = Habit(
-            name="Morning Exercise Schedule",
-            frequency_type=FrequencyType.DAILY,
-            estimated_duration=30,
-            priority_level=8
-        )
-        task = Task(
-            title="Project work schedule",
-            task_type=TaskType.ONE_TIME,
-            priority_level=7
-        )
-        schedule = DailySchedule(
-            schedule_date=unique_date,
-            day_type=DayType.WORK_DAY,
-            total_available_time=480
-        )
-        
-        test_session.add_all([tag, habit, task, schedule])
-        test_session.flush()  # Get IDs without committing
-        
-        # Create schedule items
-        habit_item = HabitScheduleItem(
-            schedule_id=schedule.id,
-            habit_id=habit.id,
-            suggested_time=time(7, 0),
-            priority_score=8.5,
-            estimated_duration=30
-        )
-        
-        task_item = TaskScheduleItem(
-            schedule_id=schedule.id,
-            task_id=task.id,
-            suggested_time=time(9, 0),
-            priority_score=9.0,
-            estimated_duration=120
-        )
-        
-        test_session.add_all([habit_item, task_item])
-        test_session.commit()
-        
-        assert habit_item.id is not None
-        assert task_item.id is not None
-        assert habit_item.habit_id == habit.id
-        assert task_item.task_id == task.id
-
     def test_model_validation(self, test_session):
         """Test that model validation works correctly."""
         with pytest.raises(ValueError, match="Duration must be positive"):
@@ -160,18 +173,16 @@ class TestDatabaseModels:
             test_session.add(invalid_habit)
             test_session.commit()
 
-    def test_soft_delete_functionality(self, test_session):
+    def test_soft_delete_functionality(self, test_session, make_tag):
         """Test soft delete and QueryMixin functionality."""
         # Create a tag
-        tag = Tag(name="Test Tag", color="#FF0000")
-        test_session.add(tag)
-        test_session.commit()
+        tag = make_tag(name="Test Tag", color="#FF0000")
         
         original_count = test_session.query(Tag).count()
         
         # Soft delete
         tag.soft_delete()
-        test_session.commit()
+        test_session.flush()
         
         # Check counts
         active_count = Tag.active_query(test_session).count()
@@ -181,74 +192,68 @@ class TestDatabaseModels:
         assert total_count == original_count, "Hard delete occurred instead of soft delete"
         assert tag.is_deleted is True
 
-    def test_relationships(self, test_session):
-        """Test that model relationships work correctly."""
-        from datetime import timedelta
-        unique_date = date.today() + timedelta(days=2)  # Use day after tomorrow
-        
-        # Create habit with schedule item
-        habit = Habit(
-            name="Test Habit Relationships",
-            frequency_type=FrequencyType.DAILY,
-            estimated_duration=30
-        )
-        schedule = DailySchedule(
-            schedule_date=unique_date,
-            day_type=DayType.WORK_DAY,
-            total_available_time=480
-        )
-        
-        test_session.add_all([habit, schedule])
-        test_session.flush()
-        
-        habit_item = HabitScheduleItem(
-            schedule_id=schedule.id,
-            habit_id=habit.id,
-            suggested_time=time(7, 0),
-            priority_score=8.5,
-            estimated_duration=30
-        )
-        test_session.add(habit_item)
-        test_session.commit()
-        
-        # Test relationships
-        habit_with_items = test_session.query(Habit).filter(Habit.id == habit.id).first()
-        assert len(habit_with_items.schedule_items) == 1
-        assert habit_with_items.schedule_items[0].schedule_id == schedule.id
-
     def test_database_indexes(self, test_database_engine):
         """Test that database indexes are properly created."""
-        inspector = inspect(test_database_engine)
-        
-        # Check that indexes exist on important tables
-        habit_indexes = inspector.get_indexes('habits')
-        task_indexes = inspector.get_indexes('tasks')
-        schedule_indexes = inspector.get_indexes('daily_schedules')
+        # Inspect through one connection rather than checking one out per call
+        with test_database_engine.connect() as conn:
+            inspector = inspect(conn)
+            
+            # Check that indexes exist on important tables
+            habit_indexes = inspector.get_indexes('habits')
+            task_indexes = inspector.get_indexes('tasks')
+            schedule_indexes = inspector.get_indexes('daily_schedules')
         
         assert len(habit_indexes) > 0, "No indexes found on habits table"
         assert len(task_indexes) > 0, "No indexes found on tasks table"
         assert len(schedule_indexes) > 0, "No indexes found on daily_schedules table"
 
-    def test_audit_fields(self, test_session):
+    def test_audit_fields(self, test_session, make_habit):
         """Test that audit fields are automatically populated."""
-        import time
-        
-        habit = Habit(
-            name="Test Habit Audit",
-            frequency_type=FrequencyType.DAILY,
-            estimated_duration=30
-        )
-        test_session.add(habit)
+        habit = make_habit(name="Test Habit Audit")
         test_session.commit()
         
         assert habit.created_at is not None
         assert habit.updated_at is not None
         assert habit.created_at == habit.updated_at  # Should be equal on creation
         
-        # Test updated_at changes on modification
-        original_updated_at = habit.updated_at
-        time.sleep(1)  # Ensure time difference
+        # updated_at comes from SQL now(), so backdate the stored value by a
+        # second instead of sleeping until the clock moves on
+        original_updated_at = habit.updated_at - timedelta(seconds=1)
+        test_session.execute(
+            update(Habit).where(Habit.id == habit.id).values(updated_at=original_updated_at)
+        )
         habit.name = "Updated Habit Name"
         test_session.commit()
         
         assert habit.updated_at > original_updated_at
+
+
+@pytest.mark.unit
+class TestScheduleGraph:
+    """Test schedule items and relationships against one shared graph."""
+
+    @pytest.fixture(autouse=True)
+    def _savepoint(self, class_session, schedule_graph):
+        """Keep each test's changes inside a SAVEPOINT on the class session."""
+        savepoint = class_session.begin_nested()
+        yield
+        if savepoint.is_active:
+            savepoint.rollback()
+
+    def test_schedule_items_creation(self, schedule_graph):
+        """Test creating schedule items with proper foreign key relationships."""
+        graph = schedule_graph
+        
+        assert graph.habit_item.id is not None
+        assert graph.task_item.id is not None
+        assert graph.habit_item.habit_id == graph.habit.id
+        assert graph.task_item.task_id == graph.task.id
+        assert graph.habit.tags == graph.task.tags == [graph.tag]
+
+    def test_relationships(self, class_session, schedule_graph):
+        """Test that model relationships work correctly."""
+        graph = schedule_graph
+        
+        habit_with_items = class_session.query(Habit).filter(Habit.id == graph.habit.id).first()
+        assert len(habit_with_items.schedule_items) == 1
+        assert habit_with_items.schedule_items[0].schedule_id == graph.schedule.id
@@ -42,3 +42,208 @@ def test_tool_registry(monkeypatch):
         
     tools = register_tools("test_category")
     assert any(t.name == "test_tool" for t in tools)
+
+def test_truncate_for_telegram_counts_utf16_units():
+    from agent.agent_helpers import truncate_for_telegram, utf16_len, TRUNCATION_SUFFIX
+
+    # Short text is returned untouched
+    assert truncate_for_telegram("hello", limit=50) == "hello"
+
+    # Emoji are two UTF-16 code units each, so 30 of them exceed a 50-unit limit
+    text = "😀" * 30
+    truncated = truncate_for_telegram(text, limit=50)
+    assert truncated.endswith(TRUNCATION_SUFFIX)
+    assert utf16_len(truncated) <= 50
+    assert truncated[:-len(TRUNCATION_SUFFIX)] == "😀" * 13
+
+
+def test_agent_replies_are_left_whole_for_the_sender_to_cut():
+    from agent.agent_helpers import _extract_response
+
+    reply = "." * 5000
+    assert _extract_response({"messages": [AIMessage(content=reply)]}) == reply
+
+
+def test_batching_queue_keeps_threads_out_of_same_batch(monkeypatch):
+    import asyncio
+    from agent import agent_helpers, rate_limiter
+    monkeypatch.setattr(rate_limiter, "wait_for_rate_limit", lambda count=1: None)
+
+    class FakeAgent:
+        def __init__(self):
+            self.batches = []
+            self.configs = []
+
+        async def aget_state(self, config):
+            return None
+
+        async def abatch(self, inputs, config, **kwargs):
+            assert "max_concurrency" not in kwargs
+            self.batches.append([c["configurable"]["thread_id"] for c in config])
+            self.configs.extend(config)
+            return [{"messages": [AIMessage(content=f"ok {c['configurable']['thread_id']}")]} for c in config]
+
+    async def run():
+        agent = FakeAgent()
+        queue = agent_helpers.BatchingAgentQueue(agent, max_batch_size=4)
+        replies = await asyncio.gather(
+            queue.submit("a", 1, 10),
+            queue.submit("b", 2, 20),
+            queue.submit("c", 1, 10),
+        )
+        return agent, replies
+
+    agent, replies = asyncio.run(run())
+    assert replies == ["ok 1", "ok 2", "ok 1"]
+    assert agent.batches == [["1", "2"], ["1"]]
+    # Runnable.abatch takes max_concurrency from the configs it is given
+    assert [c["max_concurrency"] for c in agent.configs] == [4, 4, 4]
+
+
+def test_batching_queue_rate_limits_once_and_isolates_prune_failures(monkeypatch):
+    import asyncio
+    from agent import agent_helpers, rate_limiter
+    slots = []
+    monkeypatch.setattr(rate_limiter, "wait_for_rate_limit", lambda count=1: slots.append(count))
+
+    class FakeAgent:
+        async def aget_state(self, config):
+            if config["configurable"]["thread_id"] == "2":
+                raise RuntimeError("prune failed")
+            return None
+
+        async def abatch(self, inputs, config, **kwargs):
+            return [{"messages": [AIMessage(content=f"ok {c['configurable']['thread_id']}")]} for c in config]
+
+    async def run():
+        queue = agent_helpers.BatchingAgentQueue(FakeAgent(), max_batch_size=4)
+        return await asyncio.gather(
+            queue.submit("a", 1, 10),
+            queue.submit("b", 2, 20),
+            queue.submit("c", 3, 30),
+            return_exceptions=True,
+        )
+
+    first, second, third = asyncio.run(run())
+    assert (first, third) == ("ok 1", "ok 3")
+    assert isinstance(second, RuntimeError)
+    assert slots == [3]
+
+
+def test_rate_limiter_counts_a_batch_as_one_slot(monkeypatch):
+    from agent.rate_limiter import RateLimiter
+    sleeps = []
+    monkeypatch.setattr("agent.rate_limiter.time.sleep", sleeps.append)
+
+    limiter = RateLimiter(min_delay_seconds=4.0, max_requests_per_minute=15)
+    limiter.wait_if_needed(8)
+
+    assert sleeps == []
+    assert len(limiter.request_timestamps) == 8
+
+
+def test_extract_from_parse_error():
+    from agent.agent_helpers import extract_from_parse_error
+
+    err = ValueError("Could not parse LLM output: `x` then `the real answer`")
+    assert extract_from_parse_error(err) == "the real answer"
+    assert extract_from_parse_error(ValueError("`quoted` but unrelated")) is None
+
+
+def test_register_tools_builds_each_category_once(monkeypatch):
+    from agent.tools import tool_registry
+    monkeypatch.setattr(tool_registry, "_TOOLS_CACHE", {})
+    monkeypatch.setattr(tool_registry, "_TOOL_CATEGORIES", {})
+
+    calls = []
+
+    def named(name):
+        def fn():
+            pass
+        fn.__name__ = name
+        return fn
+
+    groups = {group: [named(f"{group}_tool")] for group in tool_registry._ALL_GROUPS}
+
+    def build(group):
+        def factory(llm):
+            calls.append(group)
+            return groups[group]
+        return factory
+    monkeypatch.setattr(tool_registry, "_CATEGORIES", {g: build(g) for g in groups})
+
+    # Stand in for the tool modules register_tools imports for registration
+    import sys
+    import types
+    for name in ("telegram_scraper", "task_scheduler", "extra_tools"):
+        monkeypatch.setitem(sys.modules, f"agent.tools.{name}", types.ModuleType(name))
+
+    all_tools = register_tools("all")
+    assert register_tools("all") == all_tools
+    assert register_tools("scheduler") == groups["scheduler"]
+    assert sorted(calls) == sorted(tool_registry._ALL_GROUPS)
+
+    database = [t for t in all_tools if "database" in tool_registry.tool_categories(t)]
+    assert database == groups["database"]
+
+
+def test_register_tools_ignores_entries_for_a_recycled_llm_id(monkeypatch):
+    import gc
+    import sys
+    import types
+    from agent.tools import tool_registry
+    monkeypatch.setattr(tool_registry, "_TOOLS_CACHE", {})
+    monkeypatch.setattr(tool_registry, "_TOOL_CATEGORIES", {})
+
+    class LLM:
+        pass
+
+    def search_tool():
+        """Stand-in search tool."""
+
+    built = []
+    monkeypatch.setattr(tool_registry, "_CATEGORIES", {"search": lambda llm: built.append(llm) or [search_tool]})
+    for name in ("telegram_scraper", "task_scheduler", "extra_tools"):
+        monkeypatch.setitem(sys.modules, f"agent.tools.{name}", types.ModuleType(name))
+
+    old, new = LLM(), LLM()
+    # Simulate new taking over the id of an old LLM whose tools are cached
+    key = ("search", id(new))
+    tool_registry._TOOLS_CACHE[key] = (tool_registry._llm_ref(old, key), [])
+
+    assert register_tools("search", shared_llm=new) == [search_tool]
+    assert register_tools("search", shared_llm=new) == [search_tool]
+    assert built == [new]
+
+    # Collecting an LLM drops its entry; old's stale reference leaves new's alone
+    del old
+    gc.collect()
+    assert key in tool_registry._TOOLS_CACHE
+    built.clear()
+    del new
+    gc.collect()
+    assert tool_registry._TOOLS_CACHE == {}
+
+
+def test_register_tool_forgets_known_categories(monkeypatch):
+    from agent.tools import tool_registry
+    monkeypatch.setattr(tool_registry, "_TOOL_REGISTRY", {})
+    monkeypatch.setattr(tool_registry, "_TOOLS_CACHE", {("search", 0): (lambda: None, [])})
+    monkeypatch.setattr(tool_registry, "_TOOL_CATEGORIES", {"stale_tool": {"search"}})
+
+    @register_tool("search")
+    def fresh_tool():
+        """A freshly registered tool."""
+
+    assert tool_registry._TOOLS_CACHE == {}
+    assert tool_registry._TOOL_CATEGORIES == {}
+
+
+def test_database_tools_are_built_once_but_copied_per_caller():
+    from agent.tools.planner_tools.database_tools import get_database_tools
+
+    tools = get_database_tools()
+    tools.clear()
+    again = get_database_tools()
+    assert again and again is not tools
+    assert all(a is b for a, b in zip(again, get_database_tools()))